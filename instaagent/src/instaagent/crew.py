@@ -6,11 +6,16 @@ import os
 # Import the custom tools
 from instaagent.tools.auth_tools import InstagramAuthTool, InstagramRefreshTokenTool
 from instaagent.tools.subscription_tools import InstagramSubscriptionTool
+from instaagent.tools.follower_tools import InstagramFollowBackTool
 from instaagent.tools.content_tools import InstagramPostTool, InstagramCaptionTool
+from instaagent.tools.engagement_tools import InstagramCommentEngagementTool
 
 # Load environment variables
 load_dotenv()
 
+# Verbose output logs every prompt and tool call; set CREW_VERBOSE=false to quiet it
+VERBOSE = os.getenv("CREW_VERBOSE", "true").lower() == "true"
+
 @CrewBase
 class Instaagent():
     """Instaagent crew"""
@@ -25,7 +30,7 @@ class Instaagent():
         """Define an agent for handling Instagram authentication-related tasks."""
         return Agent(
             config=self.agents_config['insta_auth_agent'],
-            verbose=True,
+            verbose=VERBOSE,
             tools=[
                 InstagramAuthTool(),  # Handles authentication and token refresh
                 InstagramRefreshTokenTool()  # Refreshes the access token when needed
@@ -39,9 +44,10 @@ class Instaagent():
         """
         return Agent(
             config=self.agents_config['insta_subscription_agent'],
-            verbose=True,
+            verbose=VERBOSE,
             tools=[
-                InstagramSubscriptionTool()  # Handles subscription-related tasks
+                InstagramSubscriptionTool(),  # Handles subscription-related tasks
+                InstagramFollowBackTool()  # Follows back followers that don't look like bots
             ]
         )
 
@@ -55,10 +61,11 @@ class Instaagent():
         """
         return Agent(
             config=self.agents_config['insta_post_agent'],
-            verbose=True,
+            verbose=VERBOSE,
             tools=[
                 InstagramPostTool(),  # Schedules Instagram posts
-                InstagramCaptionTool()  # Generates captions for posts
+                InstagramCaptionTool(),  # Generates captions for posts
+                InstagramCommentEngagementTool()  # Replies to comments within the SLA window
             ]
         )
 
@@ -76,7 +83,7 @@ class Instaagent():
         """
         return Task(
             config=self.tasks_config['authenticate_user'],
-            agent=self.insta_auth_agent
+            agent=self.insta_auth_agent()
         )
 
     @task
@@ -92,7 +99,7 @@ class Instaagent():
         """
         return Task(
             config=self.tasks_config['refresh_token'],
-            agent=self.insta_auth_agent
+            agent=self.insta_auth_agent()
         )
 
     @task
@@ -105,7 +112,7 @@ class Instaagent():
         """
         return Task(
             config=self.tasks_config['subscribe_to_hashtags'],
-            agent=self.insta_subscription_agent
+            agent=self.insta_subscription_agent()
         )
 
     @task
@@ -120,7 +127,7 @@ class Instaagent():
         """
         return Task(
             config=self.tasks_config['schedule_post'],
-            agent=self.insta_post_agent
+            agent=self.insta_post_agent()
         )
 
     @task
@@ -136,7 +143,7 @@ class Instaagent():
         """
         return Task(
             config=self.tasks_config['generate_caption'],
-            agent=self.insta_post_agent
+            agent=self.insta_post_agent()
         )
 
     # Assemble the Crew
@@ -153,17 +160,17 @@ class Instaagent():
         """
         return Crew(
             agents=[
-                self.insta_auth_agent,  # Agent for handling authentication
-                self.insta_subscription_agent,  # Agent for managing subscriptions
-                self.insta_post_agent  # Agent for post scheduling and caption creation
+                self.insta_auth_agent(),  # Agent for handling authentication
+                self.insta_subscription_agent(),  # Agent for managing subscriptions
+                self.insta_post_agent()  # Agent for post scheduling and caption creation
             ],
             tasks=[
-                self.authenticate_user,  # Task for user authentication
-                self.refresh_token,  # Task for refreshing access tokens
-                self.subscribe_to_hashtags,  # Task for subscribing to hashtags
-                self.schedule_post,  # Task for scheduling Instagram posts
-                self.generate_caption  # Task for generating post captions
+                self.authenticate_user(),  # Task for user authentication
+                self.refresh_token(),  # Task for refreshing access tokens
+                self.subscribe_to_hashtags(),  # Task for subscribing to hashtags
+                self.schedule_post(),  # Task for scheduling Instagram posts
+                self.generate_caption()  # Task for generating post captions
             ],
             process=Process.sequential,  # Execute tasks sequentially
-            verbose=True,  # Enable verbose output for debugging
+            verbose=VERBOSE,  # Enable verbose output for debugging
         )
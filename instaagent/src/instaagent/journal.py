@@ -0,0 +1,247 @@
+"""
+Run journal for checkpointed, resumable pipeline runs.
+
+Every stage (crew task) of every work item (account/topic) is recorded with
+a hash of its inputs, its output and the hash of that output. A stage's input
+hash covers the task definition, the crew inputs it references and the
+earlier outputs it is given, so changing a preference or an upstream result
+invalidates everything that depends on it, the way an incremental build
+does. Resuming a run skips every stage whose input hash still matches a
+completed entry.
+
+Each executed stage also records its token usage and latency.
+"""
+
+from crewai import Crew, Process
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from instaagent.prompt_budget import PromptBudget, estimate_tokens
+
+JOURNAL_PATH = "data/run_journal.json"
+MAX_RUNS = 20
+TOKEN_FIELDS = ("prompt_tokens", "cached_prompt_tokens", "completion_tokens")
+# Stages that act on the account as a whole rather than on a topic
+ACCOUNT_STAGES = ("authenticate_user", "refresh_token", "subscribe_to_hashtags")
+
+
+def content_hash(value) -> str:
+    """Stable SHA-256 of any JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _token_counts(agent) -> Dict[str, int]:
+    """
+    The agent's cumulative token counters.
+
+    crewai's per-kickoff token_usage sums these counters, which are never
+    reset, so a task's own usage is the difference across its kickoff.
+    """
+    summary = agent._token_process.get_summary()
+    return {field: getattr(summary, field) for field in TOKEN_FIELDS}
+
+
+class RunJournal:
+    """
+    Stage-level checkpoints, persisted in data/run_journal.json.
+
+    The file is rewritten atomically after every stage, so a crash leaves the
+    journal at the last completed checkpoint rather than half-written.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, max_runs: int = MAX_RUNS):
+        self.path = path
+        self.max_runs = max_runs
+        try:
+            with open(path, "r") as f:
+                self._state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._state = {"latest": None, "runs": {}}
+
+    @staticmethod
+    def stage_key(account: str, topic: Optional[str], stage: str) -> str:
+        """Key for a stage; account-level stages have no topic."""
+        if topic is None:
+            return f"{account}/{stage}"
+        return f"{account}/{topic}/{stage}"
+
+    @property
+    def latest_run_id(self) -> Optional[str]:
+        return self._state.get("latest")
+
+    def start_run(self, run_id: Optional[str] = None) -> str:
+        """Open a run. Reopening an existing run id keeps its checkpoints."""
+        run_id = run_id or datetime.now().strftime("%Y%m%d%H%M%S-") + uuid.uuid4().hex[:6]
+        run = self._state["runs"].setdefault(run_id, {
+            "started_at": datetime.now().isoformat(),
+            "stages": {}
+        })
+        run["status"] = "running"
+        self._state["latest"] = run_id
+
+        # Keep only the most recent runs, plus the one being (re)opened
+        run_ids = sorted(
+            (r for r in self._state["runs"] if r != run_id),
+            key=lambda r: self._state["runs"][r]["started_at"]
+        )
+        for old in run_ids[:len(run_ids) - (self.max_runs - 1)]:
+            del self._state["runs"][old]
+
+        self.save()
+        return run_id
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        self._state["runs"][run_id]["status"] = status
+        self._state["runs"][run_id]["finished_at"] = datetime.now().isoformat()
+        self.save()
+
+    def lookup(self, run_id: str, key: str, input_hash: str) -> Optional[dict]:
+        """Return the checkpoint for `key` if it completed with the same inputs."""
+        entry = self._state["runs"].get(run_id, {}).get("stages", {}).get(key)
+        if entry and entry["status"] == "completed" and entry["input_hash"] == input_hash:
+            return entry
+        return None
+
+    def record(self, run_id: str, key: str, input_hash: str, status: str,
+               output: Optional[str] = None, error: Optional[str] = None,
+               usage: Optional[dict] = None) -> dict:
+        entry = {
+            "status": status,
+            "input_hash": input_hash,
+            "output": output,
+            "output_hash": content_hash(output) if output is not None else None,
+            "error": error,
+            "usage": usage,
+            "updated_at": datetime.now().isoformat()
+        }
+        self._state["runs"][run_id]["stages"][key] = entry
+        self.save()
+        return entry
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.path)
+
+
+def run_journaled(crew_factory: Callable[[], Crew], work_items: List[dict], resume: bool = False,
+                  run_id: Optional[str] = None, journal: Optional[RunJournal] = None,
+                  budget: Optional[PromptBudget] = None, replay_from: Optional[str] = None,
+                  account_stages: Tuple[str, ...] = ACCOUNT_STAGES) -> dict:
+    """
+    Run the crew's tasks one stage at a time for each work item, checkpointing as it goes.
+
+    Each work item is a dict with `account`, `topic` and the crew `inputs`.
+    Stages in `account_stages` run once per account, on its first work item,
+    and their output is shared with the account's other items; the remaining
+    stages run for every item.
+    With `resume`, the given (or latest) run is reopened and stages whose
+    inputs are unchanged are skipped, reusing their journaled output. A failed
+    stage stops its work item; the remaining items still run. The prompt
+    budget decides which earlier outputs each stage is given.
+
+    `replay_from` names a task to execute again, along with every task after
+    it, even if their checkpoints are still valid; earlier tasks are reused
+    from the journal.
+
+    :return: Counts of executed, skipped and failed stages, the run id and a
+        per-stage token/latency report.
+    """
+    if replay_from and replay_from not in [task.name for task in crew_factory().tasks]:
+        raise ValueError(f"Unknown task '{replay_from}'")
+
+    journal = journal or RunJournal()
+    budget = budget or PromptBudget()
+    if resume:
+        run_id = run_id or journal.latest_run_id
+    run_id = journal.start_run(run_id)
+
+    summary = {"run_id": run_id, "executed": 0, "skipped": 0, "failed": [], "report": []}
+    # Outputs of account-level stages, per (account, stage), for the account's later items
+    shared: Dict[Tuple[str, str], dict] = {}
+    failed_accounts = set()
+
+    for item in work_items:
+        if item["account"] in failed_accounts:
+            # An account-level stage failed; its other topics can't run either
+            continue
+        # A fresh crew per work item, so task descriptions start un-interpolated
+        crew = crew_factory()
+        upstream: List[Dict[str, str]] = []
+        replaying = False
+
+        for task in crew.tasks:
+            replaying = replaying or task.name == replay_from
+            account_level = task.name in account_stages
+            if account_level and (item["account"], task.name) in shared:
+                upstream.append(shared[(item["account"], task.name)])
+                continue
+
+            key = journal.stage_key(item["account"], None if account_level else item["topic"], task.name)
+            context = budget.upstream_context(task, upstream)
+            input_hash = content_hash({
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "inputs": budget.referenced_inputs(task, item["inputs"]),
+                "context": context
+            })
+
+            entry = journal.lookup(run_id, key, input_hash) if resume and not replaying else None
+            if entry:
+                summary["skipped"] += 1
+                upstream.append({"name": task.name, "output": entry["output"], "output_hash": entry["output_hash"]})
+                if account_level:
+                    shared[(item["account"], task.name)] = upstream[-1]
+                continue
+
+            inputs = dict(item["inputs"])
+            # The budgeted context replaces crewai's own chaining of earlier outputs
+            task.context = []
+            if context:
+                # Stages run as separate crews, so hand earlier results over explicitly.
+                # Appending keeps the static part of the prompt first and identical across runs.
+                task.description = f"{task.description}\n\nResults from earlier steps:\n{{previous_results}}"
+                inputs["previous_results"] = context
+
+            tokens_before = _token_counts(task.agent)
+            started = time.perf_counter()
+            try:
+                result = Crew(
+                    agents=[task.agent],
+                    tasks=[task],
+                    process=Process.sequential,
+                    verbose=crew.verbose
+                ).kickoff(inputs=inputs)
+            except Exception as e:
+                journal.record(run_id, key, input_hash, "failed", error=str(e))
+                summary["failed"].append({"stage": key, "error": str(e)})
+                if account_level:
+                    failed_accounts.add(item["account"])
+                break
+
+            latency = round(time.perf_counter() - started, 3)
+            tokens_after = _token_counts(task.agent)
+            usage = {
+                "stage": key,
+                **{field: tokens_after[field] - tokens_before[field] for field in TOKEN_FIELDS},
+                "context_tokens": estimate_tokens(context),
+                "untrimmed_context_tokens": estimate_tokens(budget.untrimmed_context(upstream)),
+                "latency_seconds": latency
+            }
+            entry = journal.record(run_id, key, input_hash, "completed", output=result.raw, usage=usage)
+            summary["executed"] += 1
+            summary["report"].append(usage)
+            upstream.append({"name": task.name, "output": entry["output"], "output_hash": entry["output_hash"]})
+            if account_level:
+                shared[(item["account"], task.name)] = upstream[-1]
+
+    journal.finish_run(run_id, "failed" if summary["failed"] else "completed")
+    return summary
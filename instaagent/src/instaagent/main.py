@@ -2,6 +2,7 @@
 import sys
 import warnings
 import os
+import json
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -9,6 +10,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from instaagent.crew import Instaagent
+from instaagent.journal import run_journaled
+from instaagent.prompt_budget import crew_inputs, format_report
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -23,7 +26,7 @@ def load_user_preferences() -> dict:
             current_section = None
             for line in f:
                 line = line.strip()
-                if not line or line.startswith("#"):
+                if not line:
                     continue
                 
                 # Check if this is a section header
@@ -32,6 +35,10 @@ def load_user_preferences() -> dict:
                     # Initialize the section as an empty dictionary
                     preferences[current_section] = {}
                     continue
+
+                # Skip the document title and other comments
+                if line.startswith("#"):
+                    continue
                 
                 # Process key-value pairs
                 if ":" in line and current_section:
@@ -45,38 +52,92 @@ def load_user_preferences() -> dict:
     
     return preferences
 
+def configured_accounts() -> list:
+    """Account labels from INSTAGRAM_ACCOUNTS (comma-separated), falling back to INSTAGRAM_ACCOUNT."""
+    accounts = os.getenv('INSTAGRAM_ACCOUNTS') or os.getenv('INSTAGRAM_ACCOUNT', 'default')
+    return [a.strip() for a in accounts.split(',') if a.strip()]
+
+def build_work_items(preferences: dict) -> list:
+    """
+    Build the journal work items for a run from the user preferences.
+
+    There is one item per configured account and content topic, each
+    pairing them with the inputs for the crew. The account-level tasks
+    (authentication, token refresh, subscriptions) run once per account;
+    scheduling and captioning run per topic, and posts are stored under
+    the item's account. Items are journaled under their own account/topic,
+    so a resumed run only redoes the items that didn't finish.
+    """
+    # Extract key information from the user preferences
+    content_topics = preferences.get('content_preferences', {}).get('content_topics', 'AI, tech')
+    topics = [t.strip() for t in content_topics.split(',') if t.strip()]
+    current_year = str(datetime.now().year)
+
+    return [
+        {
+            'account': account,
+            'topic': topic,
+            # Only the individual preference fields that tasks.yaml references
+            'inputs': crew_inputs(preferences, topic, current_year, account)
+        }
+        for account in configured_accounts()
+        for topic in topics
+    ]
+
 def run() -> None:
     """
     Run the crew.
 
     This function is responsible for loading user preferences and
-    preparing the inputs for the crew. It then kicks off the crew
-    with the provided inputs.
+    preparing the inputs for the crew. It then runs the crew one task at
+    a time, checkpointing every task in the run journal so that a failed
+    run can be picked up again with `resume`.
     """
     # Load user preferences from the file knowledge/user_preference.txt
     preferences = load_user_preferences()
-    
-    # Extract key information from the user preferences
-    content_topics = preferences.get('content_preferences', {}).get('content_topics', 'AI, tech')
-    hashtags = preferences.get('monitoring_preferences', {}).get('hashtags_to_monitor', '')
-    accounts = preferences.get('monitoring_preferences', {}).get('accounts_to_monitor', '')
-    
-    # Prepare inputs for the crew
-    inputs = {
-        'topic': content_topics.split(',')[0].strip(),  # Use first topic as default
-        'current_year': str(datetime.now().year),
-        'hashtags_to_monitor': hashtags,
-        'accounts_to_monitor': accounts,
-        'content_preferences': preferences.get('content_preferences', {})
-    }
-    
+
     try:
-        # Kick off the crew
-        Instaagent().crew().kickoff(inputs=inputs)
+        summary = run_journaled(lambda: Instaagent().crew(), build_work_items(preferences))
     except Exception as e:
         # Handle any exceptions raised during the execution of the crew
         raise Exception(f"An error occurred while running the crew: {e}")
 
+    # Per-task tokens and latency for this run
+    print(format_report(summary['report']))
+
+    if summary['failed']:
+        raise Exception(
+            f"An error occurred while running the crew: {summary['failed'][0]['error']} "
+            f"(resume with: resume {summary['run_id']})"
+        )
+
+
+def resume():
+    """
+    Resume a journaled run, re-running only invalidated or failed tasks.
+
+    The run id is read from the command line and defaults to the most recent
+    run. Tasks whose inputs (preferences, task config and upstream outputs)
+    are unchanged since they last completed are skipped.
+    """
+    preferences = load_user_preferences()
+    run_id = sys.argv[1] if len(sys.argv) >= 2 else None
+
+    try:
+        summary = run_journaled(
+            lambda: Instaagent().crew(),
+            build_work_items(preferences),
+            resume=True,
+            run_id=run_id
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while resuming the crew: {e}")
+
+    print(f"Run {summary['run_id']}: {summary['executed']} tasks executed, {summary['skipped']} skipped")
+    print(format_report(summary['report']))
+    if summary['failed']:
+        raise Exception(f"An error occurred while resuming the crew: {summary['failed'][0]['error']}")
+
 
 def train():
     """
@@ -103,9 +164,11 @@ def train():
     preferences = load_user_preferences()
     content_topics = preferences.get('content_preferences', {}).get('content_topics', 'AI, tech')
     
-    inputs = {
-        "topic": content_topics.split(',')[0].strip()  # Use first topic as default
-    }
+    inputs = crew_inputs(
+        preferences,
+        content_topics.split(',')[0].strip(),  # Use first topic as default
+        str(datetime.now().year)
+    )
     
     try:
         Instaagent().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
@@ -114,19 +177,33 @@ def train():
 
 def replay():
     """
-    Replay the crew execution from a specific task.
+    Replay a journaled run from a specific task.
 
-    This function replays the execution of the CrewAI from a specified task ID
-    passed as a command-line argument. It handles exceptions that may occur
-    during the replay process and raises an appropriate error message.
+    Takes the task name (e.g. `schedule_post`) and an optional run id,
+    defaulting to the most recent run. Tasks before it are reused from the
+    run journal; it and every task after it are executed again for each
+    account and topic.
     """
+    preferences = load_user_preferences()
+    run_id = sys.argv[2] if len(sys.argv) >= 3 else None
+
     try:
-        # Replay the crew with the given task ID from command-line arguments
-        Instaagent().crew().replay(task_id=sys.argv[1])
+        summary = run_journaled(
+            lambda: Instaagent().crew(),
+            build_work_items(preferences),
+            resume=True,
+            run_id=run_id,
+            replay_from=sys.argv[1]
+        )
     except Exception as e:
         # Raise an exception with an error message if replay fails
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+    print(f"Run {summary['run_id']}: {summary['executed']} tasks executed, {summary['skipped']} skipped")
+    print(format_report(summary['report']))
+    if summary['failed']:
+        raise Exception(f"An error occurred while replaying the crew: {summary['failed'][0]['error']}")
+
 def test():
     """
     Test the crew execution and returns the results.
@@ -157,9 +234,11 @@ def test():
     content_topics = preferences.get('content_preferences', {}).get('content_topics', 'AI, tech')
 
     # Set up the inputs to the crew
-    inputs = {
-        "topic": content_topics.split(',')[0].strip()  # Use first topic as default
-    }
+    inputs = crew_inputs(
+        preferences,
+        content_topics.split(',')[0].strip(),  # Use first topic as default
+        str(datetime.now().year)
+    )
 
     try:
         # Test the crew with the given inputs
@@ -169,10 +248,191 @@ def test():
         # Raise an exception with an error message if testing fails
         raise Exception(f"An error occurred while testing the crew: {e}")
 
+def engage():
+    """
+    Reply to new comments on recent posts within the ENGAGE_WITH_COMMENTS window.
+
+    Runs a single poll-and-reply cycle outside the crew so that routine replies
+    don't cost an agent round trip each. Pass
+    `load_test [comments_per_hour] [replies_per_second]` to replay an hour of
+    traffic against a simulated API and clock instead.
+    """
+    from instaagent.tools.engagement_tools import (
+        InstagramCommentClient,
+        build_engagement_engine,
+        parse_sla_hours,
+        run_engagement_load_test
+    )
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "load_test":
+        comments_per_hour = int(sys.argv[2]) if len(sys.argv) >= 3 else 5000
+        replies_per_second = float(sys.argv[3]) if len(sys.argv) >= 4 else 1.0
+        print(json.dumps(run_engagement_load_test(comments_per_hour=comments_per_hour,
+                                                  replies_per_second=replies_per_second), indent=2))
+        return
+
+    preferences = load_user_preferences()
+    if parse_sla_hours(preferences.get('engagement_strategy', {}).get('engage_with_comments')) is None:
+        print("Comment engagement is disabled in user preferences.")
+        return
+
+    try:
+        # Only comments that don't fit a reply template reach the LLM
+        engine = build_engagement_engine(InstagramCommentClient(), preferences)
+        print(json.dumps(engine.run_cycle(), indent=2))
+    except Exception as e:
+        raise Exception(f"An error occurred while engaging with comments: {e}")
+
+def follow_back():
+    """
+    Screen followers for bots and follow back the rest, per AUTO_FOLLOW_BACK.
+
+    Followers are scored a page at a time instead of one agent call per
+    profile. Pass `benchmark [count]` to measure screening throughput on
+    synthetic profiles instead.
+    """
+    from instaagent.tools.follower_tools import (
+        FollowerScreeningPipeline,
+        InstagramFollowerClient,
+        parse_auto_follow_back,
+        run_screening_benchmark
+    )
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "benchmark":
+        count = int(sys.argv[2]) if len(sys.argv) >= 3 else 100000
+        print(json.dumps(run_screening_benchmark(count=count), indent=2))
+        return
+
+    preferences = load_user_preferences()
+    if not parse_auto_follow_back(preferences.get('engagement_strategy', {}).get('auto_follow_back')):
+        print("Auto follow-back is disabled in user preferences.")
+        return
+
+    try:
+        pipeline = FollowerScreeningPipeline(InstagramFollowerClient())
+        print(json.dumps(pipeline.run(), indent=2))
+    except Exception as e:
+        raise Exception(f"An error occurred while screening followers: {e}")
+
+def worker():
+    """
+    Run a queue worker that processes publish, refresh, monitor and caption jobs.
+
+    Several workers can share one queue (WORK_QUEUE_URL). Set WORKER_INDEX and
+    WORKER_COUNT to give each worker a fixed share of the account partitions;
+    otherwise every worker leases from all partitions. Pass `benchmark` to
+    measure throughput against the number of worker processes instead.
+    """
+    from instaagent.work_queue import (
+        Worker,
+        default_handlers,
+        open_work_queue,
+        partitions_for_worker,
+        run_queue_benchmark
+    )
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "benchmark":
+        for result in run_queue_benchmark():
+            print(json.dumps(result))
+        return
+
+    try:
+        queue = open_work_queue()
+        partitions = None
+        if os.getenv('WORKER_COUNT'):
+            partitions = partitions_for_worker(
+                int(os.getenv('WORKER_INDEX', '0')),
+                int(os.getenv('WORKER_COUNT')),
+                queue.num_partitions
+            )
+        Worker(queue, default_handlers(), partitions=partitions).run()
+    except Exception as e:
+        raise Exception(f"An error occurred while running the worker: {e}")
+
+def enqueue():
+    """
+    Queue work for the workers.
+
+    Queues a publish job for every stored post that has an image and hasn't
+    been published yet, plus the daily token refresh and hourly monitoring
+    jobs. Each job has an idempotency key, so this is safe to run as often as
+    you like, e.g. from cron.
+    """
+    from instaagent.tools.content_tools import SCHEDULED_POSTS_PATH
+    from instaagent.work_queue import enqueue_maintenance_jobs, enqueue_publish_jobs, open_work_queue
+
+    preferences = load_user_preferences()
+
+    try:
+        try:
+            with open(SCHEDULED_POSTS_PATH, "r") as f:
+                posts = json.load(f)
+        except FileNotFoundError:
+            posts = []
+        unpublished = [p for p in posts if p.get("id") and p.get("status") != "published"]
+
+        queue = open_work_queue()
+        try:
+            summary = {
+                "publish": enqueue_publish_jobs(queue, unpublished),
+                "maintenance": enqueue_maintenance_jobs(queue, preferences),
+                "queue": queue.stats()
+            }
+        finally:
+            queue.close()
+        print(json.dumps(summary, indent=2))
+    except Exception as e:
+        raise Exception(f"An error occurred while queueing jobs: {e}")
+
+def plan():
+    """
+    Plan a content calendar for a week or a month.
+
+    Expands POST_FREQUENCY and OPTIMAL_POST_TIMES into slots for every account
+    in INSTAGRAM_ACCOUNTS (comma-separated, falling back to INSTAGRAM_ACCOUNT),
+    generates all captions and stores them in one write, then queues a
+    publish job per post for the workers. Images in PLAN_IMAGE_DIR are
+    attached to the posts in rotation. Arguments are the
+    horizon (`week` or `month`) and an optional start date (YYYY-MM-DD).
+    Pass `benchmark [accounts]` to time a month for synthetic accounts.
+    """
+    from instaagent.planner import HORIZONS, list_images, plan_calendar, run_planner_benchmark
+    from instaagent.work_queue import open_work_queue
+
+    preferences = load_user_preferences()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "benchmark":
+        accounts = int(sys.argv[2]) if len(sys.argv) >= 3 else 500
+        print(json.dumps(run_planner_benchmark(preferences, accounts=accounts), indent=2))
+        return
+
+    horizon = sys.argv[1] if len(sys.argv) >= 2 else "week"
+    if horizon not in HORIZONS:
+        print(f"Unknown horizon '{horizon}'. Use one of: {', '.join(HORIZONS)}")
+        sys.exit(1)
+    start = datetime.strptime(sys.argv[2], "%Y-%m-%d").date() if len(sys.argv) >= 3 else None
+
+    try:
+        queue = open_work_queue()
+        try:
+            summary = plan_calendar(
+                preferences,
+                configured_accounts(),
+                start=start,
+                horizon=horizon,
+                images=list_images(os.getenv('PLAN_IMAGE_DIR')),
+                queue=queue
+            )
+        finally:
+            queue.close()
+        print(json.dumps(summary, indent=2))
+    except Exception as e:
+        raise Exception(f"An error occurred while planning the calendar: {e}")
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python -m instaagent.main [run|train|replay|test] [args]")
+        print("Usage: python -m instaagent.main [run|resume|plan|train|replay|test|engage|follow_back|worker|enqueue] [args]")
         sys.exit(1)
         
     command = sys.argv[1].lower()
@@ -182,11 +442,23 @@ if __name__ == "__main__":
         run()
     elif command == "train" and len(sys.argv) >= 2:
         train()
-    elif command == "replay" and len(sys.argv) >= 1:
+    elif command == "replay" and len(sys.argv) >= 2:
         replay()
+    elif command == "resume":
+        resume()
     elif command == "test" and len(sys.argv) >= 2:
         test()
+    elif command == "engage":
+        engage()
+    elif command == "follow_back":
+        follow_back()
+    elif command == "worker":
+        worker()
+    elif command == "enqueue":
+        enqueue()
+    elif command == "plan":
+        plan()
     else:
         print("Invalid command or missing arguments")
-        print("Usage: python -m instaagent.main [run|train|replay|test] [args]")
+        print("Usage: python -m instaagent.main [run|resume|plan|train|replay|test|engage|follow_back|worker|enqueue] [args]")
         sys.exit(1)
\ No newline at end of file
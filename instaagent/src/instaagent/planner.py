@@ -0,0 +1,239 @@
+"""
+Content calendar planner.
+
+Expands POST_FREQUENCY and OPTIMAL_POST_TIMES into concrete posting slots
+for every account over a horizon, rotates CONTENT_TOPICS across the slots,
+generates all captions in one pass and writes the whole calendar to the
+schedule store in a single transaction. Each planned post gets a publish job
+on the work queue, due at its slot, which a worker picks up to publish it.
+"""
+
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, date, timedelta
+import os
+import re
+import tempfile
+import time
+
+from instaagent.tools.content_tools import InstagramCaptionTool, SCHEDULED_POSTS_PATH, save_scheduled_posts
+from instaagent.work_queue import SQLiteWorkQueue, enqueue_publish_jobs
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+HORIZONS = {"week": 7, "month": 30}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+FREQUENCY_WORDS = {
+    "once": 1, "twice": 2, "thrice": 3,
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7
+}
+CAPTION_TONES = ("professional", "casual", "funny", "engaging")
+
+_DAY = r"\b(monday|mon|tuesday|tues|tue|wednesday|wed|thursday|thurs|thu|friday|fri|saturday|sat|sunday|sun)s?\b"
+DAY_PATTERN = re.compile(_DAY)
+DAY_RANGE_PATTERN = re.compile(rf"{_DAY}\s*(?:-|–|to|through|thru|until)\s*{_DAY}")
+
+
+def _weekday(name: str) -> int:
+    return [day[:3] for day in WEEKDAYS].index(name[:3])
+
+
+def parse_post_frequency(value: Optional[str]) -> List[int]:
+    """
+    Turn POST_FREQUENCY into the weekdays to post on (0 = Monday).
+
+    Named days win: "3 times per week (Monday, Wednesday, Friday)" -> [0, 2, 4],
+    including ranges such as "Mon-Fri" or "Monday to Wednesday", and
+    "weekdays"/"weekends". Otherwise "daily" (or "once a day") posts every day,
+    "every other day" every second day, and "N times per week" (N may be
+    spelled out, e.g. "twice a week") spreads N days evenly across the week.
+    An empty value defaults to 3 times per week; anything else, including more
+    than one post a day, raises ValueError rather than guessing.
+    """
+    value = (value or "").lower()
+
+    named = set()
+    if re.search(r"\bweekdays\b", value):
+        named.update(range(5))
+    if re.search(r"\bweekends?\b", value):
+        named.update((5, 6))
+    for first, last in DAY_RANGE_PATTERN.findall(value):
+        start, end = _weekday(first), _weekday(last)
+        named.update((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+    named.update(_weekday(day) for day in DAY_PATTERN.findall(DAY_RANGE_PATTERN.sub(" ", value)))
+    if named:
+        return sorted(named)
+
+    if "every other day" in value:
+        return [0, 2, 4, 6]
+    if "daily" in value or "every day" in value:
+        return list(range(7))
+
+    words = "|".join(FREQUENCY_WORDS)
+    per_day = re.search(rf"(\d+|\b(?:{words})\b)?\s*(?:times|x|posts?)?\s*\b(?:a|per|each|/)\s*day\b", value)
+    if per_day:
+        count = per_day.group(1) or "once"
+        if (int(count) if count.isdigit() else FREQUENCY_WORDS[count]) != 1:
+            raise ValueError(f"POST_FREQUENCY '{value}' asks for more than one post a day, which isn't supported")
+        return list(range(7))
+
+    match = re.search(rf"(\d+|\b(?:{words})\b)\s*(?:times|x|posts)?\s*(?:a|per|each|/)?\s*week", value)
+    if match:
+        count = match.group(1)
+        per_week = int(count) if count.isdigit() else FREQUENCY_WORDS[count]
+    elif not value.strip():
+        per_week = 3
+    else:
+        raise ValueError(f"Can't read POST_FREQUENCY '{value}'; use e.g. '3 times per week' or name the days")
+
+    per_week = min(7, max(1, per_week))
+    return sorted({int(i * 7 / per_week) for i in range(per_week)})
+
+
+def parse_post_times(value: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse OPTIMAL_POST_TIMES ("9:00 AM, 12:00 PM, 5:00 PM") into (hour, minute) pairs."""
+    times = []
+    for hour, minute, meridiem in re.findall(r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?", (value or "").lower()):
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem.startswith("p") and hour != 12:
+            hour += 12
+        elif meridiem.startswith("a") and hour == 12:
+            hour = 0
+        if hour < 24 and minute < 60:
+            times.append((hour, minute))
+    return times or [(9, 0)]
+
+
+def parse_tones(value: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Split CONTENT_TONE into a main tone and an occasional one.
+
+    "professional with occasional casual posts" -> ("professional", "casual").
+    """
+    value = (value or "").lower()
+    found = sorted((value.find(tone), tone) for tone in CAPTION_TONES if tone in value)
+    if not found:
+        return "engaging", None
+    main = found[0][1]
+    occasional = next((tone for _, tone in found[1:]), None)
+    return main, occasional
+
+
+def parse_hashtag_count(value: Optional[str], default: int = 5) -> int:
+    """HASHTAG_COUNT like "5-7 per post" uses the upper bound of the range."""
+    numbers = [int(n) for n in re.findall(r"\d+", value or "")]
+    return max(numbers) if numbers else default
+
+
+def expand_slots(weekdays: List[int], times: List[Tuple[int, int]], start: date, days: int) -> List[datetime]:
+    """
+    Concrete posting slots from `start` for `days` days.
+
+    Each posting day gets one slot; its time rotates through the optimal
+    times so the audience is reached at different times of day.
+    """
+    slots = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() in weekdays:
+            hour, minute = times[len(slots) % len(times)]
+            slots.append(datetime(day.year, day.month, day.day, hour, minute))
+    return slots
+
+
+def list_images(image_dir: Optional[str]) -> List[str]:
+    """Image files in `image_dir`, sorted by name, to attach to planned posts; empty if it is missing."""
+    if not image_dir or not os.path.isdir(image_dir):
+        return []
+    return sorted(
+        os.path.join(image_dir, name) for name in os.listdir(image_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def plan_calendar(preferences: dict, accounts: List[str], start: Optional[date] = None,
+                  horizon: Union[str, int] = "week", path: str = SCHEDULED_POSTS_PATH,
+                  images: Optional[List[str]] = None, queue=None) -> dict:
+    """
+    Plan and store posts for every account over the horizon.
+
+    Topics rotate per slot, offset per account so accounts sharing the same
+    preferences don't all cover the same topic on the same day. Captions come
+    from the caption tool's templates, so no agent round trip is needed per
+    post. Slots already in the schedule are left untouched.
+
+    `images` are attached to the posts in rotation. With a `queue`, every newly
+    stored post that has an image gets a publish job due at its slot. Posts
+    planned without one keep `image_path` empty and get no job until an image
+    is set and `main enqueue` is run.
+
+    :return: Counts of planned, newly stored, queued and imageless posts, plus
+        the elapsed time.
+    """
+    started = time.perf_counter()
+    content = preferences.get('content_preferences', {})
+    engagement = preferences.get('engagement_strategy', {})
+    restrictions = preferences.get('content_restrictions', {})
+
+    topics = [t.strip() for t in content.get('content_topics', 'AI, tech').split(',') if t.strip()]
+    avoid_hashtags = {h.strip().lstrip('#').lower() for h in restrictions.get('avoid_hashtags', '').split(',') if h.strip()}
+    main_tone, occasional_tone = parse_tones(content.get('content_tone'))
+    hashtags_count = parse_hashtag_count(engagement.get('hashtag_count'))
+
+    start = start or date.today() + timedelta(days=1)
+    slots = expand_slots(
+        parse_post_frequency(content.get('post_frequency')),
+        parse_post_times(content.get('optimal_post_times')),
+        start,
+        horizon if isinstance(horizon, int) else HORIZONS[horizon]
+    )
+
+    caption_tool = InstagramCaptionTool()
+    created_at = datetime.now().isoformat()
+    posts = []
+
+    for account_index, account in enumerate(accounts):
+        for slot_index, slot in enumerate(slots):
+            topic = topics[(slot_index + account_index) % len(topics)]
+            # Every fourth post uses the occasional tone, if there is one
+            tone = occasional_tone if occasional_tone and slot_index % 4 == 3 else main_tone
+            caption = caption_tool._run(topic=topic, tone=tone, hashtags_count=hashtags_count)
+            if avoid_hashtags:
+                caption = " ".join(w for w in caption.split(" ") if w.lstrip('#').lower() not in avoid_hashtags)
+
+            posts.append({
+                "account": account,
+                "source": "calendar",
+                "topic": topic,
+                "caption": caption,
+                "image_path": images[len(posts) % len(images)] if images else None,
+                "scheduled_time": slot.isoformat(),
+                "status": "planned",
+                "created_at": created_at
+            })
+
+    stored = save_scheduled_posts(posts, path=path)
+    queued = enqueue_publish_jobs(queue, stored) if queue is not None else 0
+    return {
+        "accounts": len(accounts),
+        "slots_per_account": len(slots),
+        "planned": len(posts),
+        "stored": len(stored),
+        "queued": queued,
+        "without_image": sum(1 for post in stored if not post.get("image_path")),
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def run_planner_benchmark(preferences: dict, accounts: int = 500, horizon: str = "month") -> dict:
+    """Plan a horizon for `accounts` synthetic accounts into a throwaway schedule store and queue."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SQLiteWorkQueue(os.path.join(tmp, "work_queue.db"))
+        try:
+            return plan_calendar(
+                preferences,
+                [f"account_{i}" for i in range(accounts)],
+                horizon=horizon,
+                path=os.path.join(tmp, "scheduled_posts.json"),
+                queue=queue
+            )
+        finally:
+            queue.close()
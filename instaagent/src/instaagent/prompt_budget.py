@@ -0,0 +1,150 @@
+"""
+Prompt budget for crew tasks.
+
+Keeps what each task sends to the LLM down to what it needs:
+
+- Preferences are flattened into individual crew inputs, and each task's
+  description only references the fields it uses (see config/tasks.yaml).
+- Earlier task outputs are only handed to a task that lists them in its
+  `context`, and each one is capped at a token budget.
+- Agent role/goal/backstory stay free of per-run values, so an agent's
+  system prompt is the same on every call.
+
+Provider-side prompt caching is out of scope: nothing here marks prompts
+for caching, and these system prompts are below the minimum length
+(OpenAI: 1024 tokens) at which providers cache a prefix on their own. The
+report's `cached` column shows whatever the provider reports reusing.
+
+Set PROMPT_BUDGET=off to fall back to chaining every earlier output in full,
+e.g. to measure the difference.
+"""
+
+from typing import Dict, List, Optional
+import os
+import re
+
+TEMPLATE_VARIABLE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+DEFAULT_UPSTREAM_TOKENS = 300
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character estimate
+    _ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when available, otherwise ~4 characters per token."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the beginning of `text` up to `max_tokens`, marking the cut."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if _ENCODING is not None:
+        head = _ENCODING.decode(_ENCODING.encode(text)[:max_tokens])
+    else:
+        head = text[:max_tokens * 4]
+    return head.rstrip() + " …[truncated]"
+
+
+def crew_inputs(preferences: dict, topic: str, current_year: str, account: str = "default") -> Dict[str, str]:
+    """
+    Flatten user preferences into the individual inputs referenced by tasks.yaml.
+
+    Only plain strings are passed, never the whole preference sections, so a
+    task's prompt grows only with the fields it actually mentions.
+    """
+    content = preferences.get('content_preferences', {})
+    engagement = preferences.get('engagement_strategy', {})
+    monitoring = preferences.get('monitoring_preferences', {})
+    restrictions = preferences.get('content_restrictions', {})
+
+    return {
+        'account': account,
+        'topic': topic,
+        'current_year': current_year,
+        'content_tone': content.get('content_tone', 'engaging'),
+        'post_frequency': content.get('post_frequency', '3 times per week'),
+        'optimal_post_times': content.get('optimal_post_times', '9:00 AM'),
+        'hashtag_count': engagement.get('hashtag_count', '5 per post'),
+        'hashtags_to_monitor': monitoring.get('hashtags_to_monitor', ''),
+        'accounts_to_monitor': monitoring.get('accounts_to_monitor', ''),
+        'avoid_topics': restrictions.get('avoid_topics', 'none')
+    }
+
+
+class PromptBudget:
+    """Decides which inputs and earlier outputs a task sees, and how much of them."""
+
+    def __init__(self, max_upstream_tokens: Optional[int] = None, enabled: Optional[bool] = None):
+        if max_upstream_tokens is None:
+            max_upstream_tokens = int(os.getenv("PROMPT_BUDGET_UPSTREAM_TOKENS", DEFAULT_UPSTREAM_TOKENS))
+        if enabled is None:
+            enabled = os.getenv("PROMPT_BUDGET", "on").lower() != "off"
+        self.max_upstream_tokens = max_upstream_tokens
+        self.enabled = enabled
+
+    @staticmethod
+    def referenced_inputs(task, inputs: dict) -> dict:
+        """The subset of crew inputs that the task's description or expected output mentions."""
+        names = set(TEMPLATE_VARIABLE.findall(f"{task.description} {task.expected_output}"))
+        return {name: inputs[name] for name in sorted(names) if name in inputs}
+
+    @staticmethod
+    def dependencies(task) -> Optional[List[str]]:
+        """Names of the tasks listed in the task's `context`, or None if it doesn't declare any."""
+        if isinstance(task.context, list):
+            return [t.name for t in task.context]
+        return None
+
+    def upstream_context(self, task, upstream: List[dict]) -> str:
+        """Earlier outputs for the task: its declared dependencies only, each within budget."""
+        if not self.enabled:
+            return self.untrimmed_context(upstream)
+
+        wanted = self.dependencies(task)
+        selected = [stage for stage in upstream if wanted is None or stage["name"] in wanted]
+        return "\n\n".join(
+            f"{stage['name']}: {truncate_to_tokens(stage['output'], self.max_upstream_tokens)}"
+            for stage in selected
+        )
+
+    @staticmethod
+    def untrimmed_context(upstream: List[dict]) -> str:
+        """What sequential chaining would send: every earlier output, in full."""
+        return "\n\n".join(f"{stage['name']}: {stage['output']}" for stage in upstream)
+
+
+def format_report(stages: List[dict]) -> str:
+    """Render per-task tokens and latency, with totals, as a plain-text table."""
+    columns = [
+        ("prompt", "prompt_tokens"),
+        ("cached", "cached_prompt_tokens"),
+        ("output", "completion_tokens"),
+        ("context", "context_tokens"),
+        ("untrimmed", "untrimmed_context_tokens")
+    ]
+    header = f"{'task':<40}" + "".join(f" {title:>9}" for title, _ in columns) + f" {'latency':>8}"
+    lines = [header, "-" * len(header)]
+    totals = dict.fromkeys([key for _, key in columns] + ["latency_seconds"], 0)
+
+    for stage in stages:
+        lines.append(
+            f"{stage['stage']:<40}" + "".join(f" {stage[key]:>9}" for _, key in columns)
+            + f" {stage['latency_seconds']:>7.2f}s"
+        )
+        for key in totals:
+            totals[key] += stage[key]
+
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'total':<40}" + "".join(f" {totals[key]:>9}" for _, key in columns)
+        + f" {totals['latency_seconds']:>7.2f}s"
+    )
+    return "\n".join(lines)
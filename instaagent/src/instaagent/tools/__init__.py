@@ -10,14 +10,20 @@ from .auth_tools import InstagramAuthTool, InstagramRefreshTokenTool
 
 # Subscription tools
 from .subscription_tools import InstagramSubscriptionTool
+from .follower_tools import InstagramFollowBackTool
 
 # Content tools
 from .content_tools import InstagramPostTool, InstagramCaptionTool
 
+# Engagement tools
+from .engagement_tools import InstagramCommentEngagementTool
+
 __all__ = [
     'InstagramAuthTool',
     'InstagramRefreshTokenTool',
     'InstagramSubscriptionTool',
+    'InstagramFollowBackTool',
     'InstagramPostTool',
-    'InstagramCaptionTool'
+    'InstagramCaptionTool',
+    'InstagramCommentEngagementTool'
 ]
\ No newline at end of file
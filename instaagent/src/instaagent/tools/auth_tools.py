@@ -21,13 +21,20 @@ class InstagramAuthTool(BaseTool):
     )
     args_schema: Type[BaseModel] = InstagramAuthInput
     
-    def _run(self, input: InstagramAuthInput) -> str:
+    def _run(self, client_id: str, client_secret: str, redirect_uri: str, code: Optional[str] = None) -> str:
         """
         Handle Instagram authentication.
         
         If code is not provided, returns the authorization URL.
         If code is provided, exchanges it for access and refresh tokens.
         """
+        input = InstagramAuthInput(
+            client_id=client_id,
+            client_secret=client_secret,
+            redirect_uri=redirect_uri,
+            code=code
+        )
+
         # Store credentials securely (in a real implementation, use a secure storage method)
         self._save_credentials(input)
         
@@ -117,44 +124,50 @@ class InstagramRefreshTokenTool(BaseTool):
     def _run(self) -> str:
         """Refresh the Instagram access token if needed."""
         try:
-            # Load current tokens
-            with open("credentials/instagram_tokens.json", "r") as f:
-                tokens = json.load(f)
-            
-            # Check if token needs refresh (refresh if less than 7 days remaining)
-            expires_at = tokens.get("expires_at", 0)
-            now = datetime.now().timestamp()
-            
-            # If token expires in less than 7 days, refresh it
-            if expires_at - now < 7 * 24 * 60 * 60:
-                # Load credentials
-                with open("credentials/instagram_credentials.json", "r") as f:
-                    credentials = json.load(f)
-                
-                # Refresh token
-                url = "https://graph.instagram.com/refresh_access_token"
-                params = {
-                    "grant_type": "ig_refresh_token",
-                    "access_token": tokens["access_token"]
-                }
-                
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                refresh_data = response.json()
-                
-                # Update token data
-                tokens["access_token"] = refresh_data["access_token"]
-                tokens["expires_at"] = (datetime.now() + timedelta(days=60)).timestamp()
-                
-                # Save updated tokens
-                with open("credentials/instagram_tokens.json", "w") as f:
-                    json.dump(tokens, f)
-                
-                return f"Access token refreshed successfully. Valid until {datetime.fromtimestamp(tokens['expires_at']).strftime('%Y-%m-%d %H:%M:%S')}"
-            
-            return f"Token is still valid until {datetime.fromtimestamp(expires_at).strftime('%Y-%m-%d %H:%M:%S')}. No refresh needed."
-        
+            return self.refresh()
         except FileNotFoundError:
             return "No token found. Please authenticate first."
         except requests.exceptions.RequestException as e:
             return f"Token refresh failed: {str(e)}"
+
+    def refresh(self) -> str:
+        """
+        Like `_run`, but raises instead of returning an error message when there
+        is no token or the refresh call fails. Used by the worker's refresh jobs.
+        """
+        # Load current tokens
+        with open("credentials/instagram_tokens.json", "r") as f:
+            tokens = json.load(f)
+
+        # Check if token needs refresh (refresh if less than 7 days remaining)
+        expires_at = tokens.get("expires_at", 0)
+        now = datetime.now().timestamp()
+
+        # If token expires in less than 7 days, refresh it
+        if expires_at - now < 7 * 24 * 60 * 60:
+            # Load credentials
+            with open("credentials/instagram_credentials.json", "r") as f:
+                credentials = json.load(f)
+
+            # Refresh token
+            url = "https://graph.instagram.com/refresh_access_token"
+            params = {
+                "grant_type": "ig_refresh_token",
+                "access_token": tokens["access_token"]
+            }
+
+            response = requests.get(url, params=params)
+            response.raise_for_status()
+            refresh_data = response.json()
+
+            # Update token data
+            tokens["access_token"] = refresh_data["access_token"]
+            tokens["expires_at"] = (datetime.now() + timedelta(days=60)).timestamp()
+
+            # Save updated tokens
+            with open("credentials/instagram_tokens.json", "w") as f:
+                json.dump(tokens, f)
+
+            return f"Access token refreshed successfully. Valid until {datetime.fromtimestamp(tokens['expires_at']).strftime('%Y-%m-%d %H:%M:%S')}"
+
+        return f"Token is still valid until {datetime.fromtimestamp(expires_at).strftime('%Y-%m-%d %H:%M:%S')}. No refresh needed."
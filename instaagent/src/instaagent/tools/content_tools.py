@@ -4,16 +4,125 @@ from pydantic import BaseModel, Field
 import requests
 import json
 import os
+import fcntl
+import hashlib
+from contextlib import contextmanager
 from datetime import datetime
 import time
 import random
 
+SCHEDULED_POSTS_PATH = "data/scheduled_posts.json"
+
+
+def _post_identity(post: dict) -> tuple:
+    """Calendar posts are unique per account and slot; other posts by account, caption, image and time."""
+    if post.get("source") == "calendar":
+        return (post["account"], post.get("scheduled_time"))
+    return (post.get("account"), post.get("caption"), post.get("image_path"), post.get("scheduled_time"))
+
+
+def _post_id(post: dict) -> str:
+    """Stable id for a stored post, derived from its identity."""
+    return hashlib.sha1(json.dumps(_post_identity(post), default=str).encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def _locked_schedule(path: str):
+    """
+    Exclusive read-modify-write access to the schedule store.
+
+    Several worker processes may touch the store at once, so the list is read
+    and written back under an exclusive file lock, and the file is replaced
+    atomically. Nothing is written if the block raises.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        try:
+            # Load existing data if any
+            with open(path, "r") as f:
+                posts = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            posts = []
+
+        yield posts
+
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(posts, f, default=str)
+        os.replace(f"{path}.tmp", path)
+
+
+def save_scheduled_posts(posts: List[dict], path: str = SCHEDULED_POSTS_PATH) -> List[dict]:
+    """
+    Add posts to the schedule store in a single transaction.
+
+    Posts that are already stored are skipped, which makes retried jobs and
+    re-planned calendars harmless. Every added post gets an `id`.
+
+    :return: The posts actually added.
+    """
+    added = []
+    with _locked_schedule(path) as existing_data:
+        seen = {_post_identity(p) for p in existing_data}
+        for post in posts:
+            identity = _post_identity(post)
+            if identity in seen:
+                continue
+            seen.add(identity)
+            post["id"] = _post_id(post)
+            existing_data.append(post)
+            added.append(post)
+    return added
+
+
+def publish_scheduled_post(post_id: str, path: str = SCHEDULED_POSTS_PATH) -> str:
+    """
+    Publish a stored post and mark it published. Used by the worker's publish jobs.
+
+    The schedule lock is only held to claim the post (status "publishing") and
+    to mark it published afterwards, not while talking to Instagram, so other
+    workers can keep reading and writing the store in the meantime. The job's
+    lease already keeps two workers from publishing the same post; a post left
+    in "publishing" by a crashed worker is claimed again by the retried job.
+
+    Publishing an already published post is a no-op, so a retried job never
+    posts twice. A post whose image is missing raises, so the job is retried
+    and eventually marked dead.
+    """
+    with _locked_schedule(path) as posts:
+        post = next((p for p in posts if p.get("id") == post_id), None)
+        if post is None:
+            raise LookupError(f"No scheduled post with id {post_id}")
+        if post.get("status") == "published":
+            return f"Post {post_id} was already published"
+        if not post.get("image_path") or not os.path.exists(post["image_path"]):
+            raise FileNotFoundError(f"Post {post_id} has no image attached")
+
+        post["status"] = "publishing"
+        scheduled_time = post["scheduled_time"]
+
+    # In a real implementation, you would:
+    # 1. Upload the image to Instagram's servers
+    # 2. Create a media container with the caption
+    # 3. Publish the container
+
+    with _locked_schedule(path) as posts:
+        for post in posts:
+            if post.get("id") == post_id:
+                post["status"] = "published"
+                post["published_at"] = datetime.now().isoformat()
+
+    return f"Published post {post_id} scheduled for {scheduled_time}"
+
 
 class InstagramPostInput(BaseModel):
     """Input schema for Instagram Post Scheduling Tool."""
     caption: str = Field(..., description="Caption for the post")
     image_path: str = Field(..., description="Path to image file to be posted")
     scheduled_time: Optional[datetime] = Field(None, description="Time to schedule post (ISO format, e.g. '2023-10-15T14:30:00')")
+    account: Optional[str] = Field(None, description="Account the post belongs to")
 
 class InstagramPostTool(BaseTool):
     name: str = "Instagram Post Scheduling Tool"
@@ -23,7 +132,8 @@ class InstagramPostTool(BaseTool):
     )
     args_schema: Type[BaseModel] = InstagramPostInput
     
-    def _run(self, caption: str, image_path: str, scheduled_time: Optional[str] = None) -> str:
+    def _run(self, caption: str, image_path: str, scheduled_time: Optional[str] = None,
+             account: Optional[str] = None) -> str:
         """
         Schedule an Instagram post.
         
@@ -64,6 +174,7 @@ class InstagramPostTool(BaseTool):
             
             # Save scheduled post information
             post_info = {
+                "account": account or os.getenv("INSTAGRAM_ACCOUNT", "default"),
                 "caption": caption,
                 "image_path": image_path,
                 "scheduled_time": scheduled_time,
@@ -81,21 +192,15 @@ class InstagramPostTool(BaseTool):
             return f"Post scheduling failed: {str(e)}"
     
     def _save_scheduled_post(self, post_info: dict) -> None:
-        """Save scheduled post information."""
-        os.makedirs("data", exist_ok=True)
-        
+        """Save scheduled post information and queue its publish job."""
+        from instaagent.work_queue import enqueue_publish_jobs, open_work_queue
+
+        added = save_scheduled_posts([post_info])
+        queue = open_work_queue()
         try:
-            # Load existing data if any
-            with open("data/scheduled_posts.json", "r") as f:
-                existing_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            existing_data = []
-        
-        # Add new post info
-        existing_data.append(post_info)
-        
-        with open("data/scheduled_posts.json", "w") as f:
-            json.dump(existing_data, f)
+            enqueue_publish_jobs(queue, added)
+        finally:
+            queue.close()
 
 
 class InstagramCaptionInput(BaseModel):
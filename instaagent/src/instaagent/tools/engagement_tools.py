@@ -0,0 +1,688 @@
+from crewai.tools import BaseTool
+from typing import Type, List, Optional, Callable, Dict, Tuple
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+import requests
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+
+GRAPH_API_URL = "https://graph.instagram.com"
+DEFAULT_SLA_HOURS = 2.0
+
+
+def parse_sla_hours(preference: Optional[str], default: float = DEFAULT_SLA_HOURS) -> Optional[float]:
+    """
+    Read the reply window out of the ENGAGE_WITH_COMMENTS preference.
+
+    "Yes, within 2 hours of posting" -> 2.0, "No" -> None (engagement disabled).
+    A plain "Yes" falls back to the default window.
+    """
+    if not preference:
+        return None
+    if preference.strip().lower().startswith("no"):
+        return None
+
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(hour|hr|minute|min)", preference.lower())
+    if not match:
+        return default
+
+    amount = float(match.group(1))
+    return amount / 60 if match.group(2).startswith("min") else amount
+
+
+def _parse_timestamp(value) -> float:
+    """Graph API timestamps look like 2023-10-15T14:30:00+0000; fakes may already send epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z").timestamp()
+
+
+class InstagramCommentClient:
+    """Minimal Graph API client for the comment engagement endpoints."""
+
+    def __init__(self, access_token: Optional[str] = None, user_id: Optional[str] = None, timeout: int = 10):
+        if access_token is None:
+            # Fall back to the tokens stored by InstagramAuthTool
+            with open("credentials/instagram_tokens.json", "r") as f:
+                tokens = json.load(f)
+            access_token = tokens["access_token"]
+            user_id = user_id or tokens.get("user_id")
+
+        self.access_token = access_token
+        self.user_id = user_id
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, path: str, **params) -> dict:
+        params["access_token"] = self.access_token
+        response = self.session.get(f"{GRAPH_API_URL}/{path}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def recent_media(self, since: float) -> List[dict]:
+        """Return media published after `since` (epoch seconds), newest first."""
+        media = []
+        after = None
+        while True:
+            params = {"fields": "id,timestamp", "limit": 25}
+            if after:
+                params["after"] = after
+            page = self._get(f"{self.user_id or 'me'}/media", **params)
+
+            for item in page.get("data", []):
+                published = _parse_timestamp(item["timestamp"])
+                if published < since:
+                    # Media is returned newest first, so everything after this is older
+                    return media
+                media.append({"id": item["id"], "timestamp": published})
+
+            paging = page.get("paging", {})
+            if "next" not in paging:
+                return media
+            after = paging.get("cursors", {}).get("after")
+
+    def comments_page(self, media_id: str, after: Optional[str] = None,
+                      limit: int = 50) -> Tuple[List[dict], Optional[str], bool]:
+        """
+        Fetch one page of comments for a media object.
+
+        Returns (comments, cursor, has_more). The cursor is returned even on the
+        last page so the next poll can resume where this one stopped.
+        """
+        params = {"fields": "id,text,timestamp,username", "limit": limit}
+        if after:
+            params["after"] = after
+        page = self._get(f"{media_id}/comments", **params)
+
+        comments = [
+            {
+                "id": item["id"],
+                "text": item.get("text", ""),
+                "username": item.get("username", ""),
+                "timestamp": _parse_timestamp(item["timestamp"])
+            }
+            for item in page.get("data", [])
+        ]
+        paging = page.get("paging", {})
+        cursor = paging.get("cursors", {}).get("after", after)
+        return comments, cursor, "next" in paging
+
+    def username(self) -> str:
+        """Username of the authenticated account, so its own comments can be skipped."""
+        return self._get(self.user_id or "me", fields="username").get("username", "")
+
+    def post_reply(self, comment_id: str, message: str) -> dict:
+        """Reply to a comment."""
+        response = self.session.post(
+            f"{GRAPH_API_URL}/{comment_id}/replies",
+            data={"message": message, "access_token": self.access_token},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class CommentCursorStore:
+    """
+    Per-media fetch position, persisted in data/comment_cursors.json.
+
+    Alongside the cursor we keep a bounded window of comment ids already replied
+    to, so re-reading a page never produces a duplicate reply. The cursor is only
+    moved past a page once every comment on it has been answered.
+    """
+
+    def __init__(self, path: Optional[str] = "data/comment_cursors.json", max_seen: int = 1000):
+        self.path = path
+        self.max_seen = max_seen
+        self._state: Dict[str, dict] = {}
+        self._lock = threading.Lock()  # Replies are marked from the worker pool
+
+        if path:
+            try:
+                with open(path, "r") as f:
+                    self._state = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._state = {}
+
+    def cursor(self, media_id: str) -> Optional[str]:
+        return self._state.get(media_id, {}).get("after")
+
+    def is_seen(self, media_id: str, comment_id: str) -> bool:
+        return comment_id in self._state.get(media_id, {}).get("seen", [])
+
+    def set_cursor(self, media_id: str, cursor: Optional[str]) -> None:
+        with self._lock:
+            self._state.setdefault(media_id, {"after": None, "seen": []})["after"] = cursor
+
+    def mark_seen(self, media_id: str, comment_id: str) -> None:
+        with self._lock:
+            entry = self._state.setdefault(media_id, {"after": None, "seen": []})
+            entry["seen"] = (entry["seen"] + [comment_id])[-self.max_seen:]
+
+    def prune(self, active_media_ids: List[str]) -> None:
+        """Forget media that has aged out of the engagement window."""
+        active = set(active_media_ids)
+        self._state = {media_id: entry for media_id, entry in self._state.items() if media_id in active}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.path)
+
+
+class DeadlineQueue:
+    """Priority queue of pending comments, earliest SLA deadline first."""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, deadline: float, item: dict) -> None:
+        # The counter keeps ordering stable for comments sharing a deadline
+        heapq.heappush(self._heap, (deadline, item["timestamp"], next(self._counter), item))
+
+    def pop_batch(self, size: int) -> List[dict]:
+        batch = []
+        while self._heap and len(batch) < size:
+            batch.append(heapq.heappop(self._heap)[-1])
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class ReplyDrafter:
+    """
+    Drafts replies for a batch of comments.
+
+    Short praise, thanks and emoji-only comments are answered from templates.
+    Everything else (questions, longer remarks) is sent to the LLM in a single
+    prompt per batch instead of one round trip per comment.
+    """
+
+    templates = {
+        "praise": [
+            "Thank you so much, @{username}! 🙌",
+            "Really appreciate that, @{username}!",
+            "Glad you enjoyed it, @{username}! 😊"
+        ],
+        "short": [
+            "Thanks for stopping by, @{username}!",
+            "🙏 Thanks @{username}!",
+            "Appreciate you, @{username}!"
+        ]
+    }
+    fallback_template = "Thanks for sharing your thoughts, @{username}! 💬"
+
+    praise_words = ("thank", "love", "great", "awesome", "amazing", "nice", "cool", "congrats", "helpful", "useful")
+
+    def __init__(self, llm: Optional[Callable[[str], str]] = None, tone: str = "professional"):
+        self.llm = llm
+        self.tone = tone
+
+    def classify(self, text: str) -> Optional[str]:
+        """Return the template intent for a comment, or None if it needs the LLM."""
+        text = text.strip().lower()
+        if "?" in text:
+            return None
+        words = re.findall(r"[a-z']+", text)
+        if not words:
+            return "short"  # Emoji-only or punctuation
+        if len(text) <= 80 and any(word in text for word in self.praise_words):
+            return "praise"
+        if len(words) <= 3:
+            return "short"
+        return None
+
+    def draft_batch(self, comments: List[dict]) -> List[str]:
+        """Return one reply per comment, in the same order."""
+        replies: List[Optional[str]] = []
+        needs_llm = []
+
+        for index, comment in enumerate(comments):
+            intent = self.classify(comment["text"])
+            if intent:
+                template = random.choice(self.templates[intent])
+                replies.append(template.format(username=comment["username"]))
+            else:
+                replies.append(None)
+                needs_llm.append(index)
+
+        if needs_llm:
+            drafted = self._draft_with_llm([comments[i] for i in needs_llm])
+            for index, reply in zip(needs_llm, drafted):
+                replies[index] = reply
+
+        return replies
+
+    def _draft_with_llm(self, comments: List[dict]) -> List[str]:
+        fallback = [self.fallback_template.format(username=c["username"]) for c in comments]
+        if self.llm is None:
+            return fallback
+
+        numbered = "\n".join(f"{i + 1}. @{c['username']}: {c['text']}" for i, c in enumerate(comments))
+        prompt = (
+            f"You manage an Instagram account. Write a short, {self.tone} reply to each comment below. "
+            f"Address the commenter by @username and keep each reply under 200 characters.\n\n"
+            f"{numbered}\n\n"
+            f"Respond with a JSON array of exactly {len(comments)} strings, in order, and nothing else."
+        )
+
+        try:
+            raw = self.llm(prompt)
+            start, end = raw.find("["), raw.rfind("]")
+            drafted = json.loads(raw[start:end + 1])
+        except Exception:
+            return fallback
+
+        if not isinstance(drafted, list) or len(drafted) != len(comments):
+            return fallback
+        return [str(reply) if reply else default for reply, default in zip(drafted, fallback)]
+
+
+class EngagementMetrics:
+    """Thread-safe counters for SLA hit rate and queue lag."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.replied = 0
+        self.failed = 0
+        self.retried = 0
+        self.sla_hits = 0
+        self.queue_lags: List[float] = []
+
+    def record(self, item: dict, posted_at: Optional[float]) -> None:
+        """Record a posted reply, or a comment given up on when `posted_at` is None."""
+        with self._lock:
+            if posted_at is None:
+                self.failed += 1
+                return
+            self.replied += 1
+            if posted_at <= item["deadline"]:
+                self.sla_hits += 1
+            self.queue_lags.append(posted_at - item["enqueued_at"])
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retried += 1
+
+    def summary(self, backlog: int = 0) -> dict:
+        with self._lock:
+            lags = sorted(self.queue_lags)
+            handled = self.replied + self.failed
+            return {
+                "replied": self.replied,
+                "failed": self.failed,
+                "retried": self.retried,
+                "backlog": backlog,
+                "sla_hit_rate": round(self.sla_hits / handled, 4) if handled else 1.0,
+                "queue_lag_avg": round(sum(lags) / len(lags), 3) if lags else 0.0,
+                "queue_lag_p95": round(lags[int(0.95 * (len(lags) - 1))], 3) if lags else 0.0,
+                "queue_lag_max": round(lags[-1], 3) if lags else 0.0
+            }
+
+
+class CommentEngagementEngine:
+    """
+    Keeps up with comments on recently published media.
+
+    Each cycle polls every media object still inside the SLA window, resuming
+    from its stored cursor, pushes new comments into a deadline-ordered queue,
+    drafts replies in batches and posts them through a bounded worker pool.
+
+    A comment only counts as seen once its reply is posted, and a media's
+    cursor only moves past pages whose comments have all been answered, so a
+    failed reply or a crash before the queue is drained never loses comments.
+    Failed replies go back into the queue for the next cycle while their SLA
+    window is still open, up to `max_attempts` tries.
+
+    `reply_budget` caps the replies attempted per cycle, e.g. to stay within
+    the Graph API rate limit; whatever doesn't fit stays queued for the next
+    cycle, earliest deadline first.
+    """
+
+    def __init__(self, client, drafter: Optional[ReplyDrafter] = None, sla_hours: float = DEFAULT_SLA_HOURS,
+                 concurrency: int = 4, batch_size: int = 25, cursor_store: Optional[CommentCursorStore] = None,
+                 own_username: Optional[str] = None, max_attempts: int = 3, clock: Callable[[], float] = time.time,
+                 reply_budget: Optional[int] = None):
+        self.client = client
+        self.drafter = drafter or ReplyDrafter()
+        self.sla_seconds = sla_hours * 3600
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.cursors = cursor_store if cursor_store is not None else CommentCursorStore()
+        self.own_username = own_username
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.reply_budget = reply_budget
+        self.queue = DeadlineQueue()
+        self.metrics = EngagementMetrics()
+        # Comment ids queued or awaiting a retry, so polling doesn't queue them twice
+        self._pending: Dict[str, dict] = {}
+        # Per media, the cursor each page was fetched from and the cursor after the last page
+        self._pages: Dict[str, Tuple[List[Optional[str]], Optional[str]]] = {}
+
+    def poll(self) -> int:
+        """Fetch new comments for media inside the SLA window. Returns how many were queued."""
+        now = self.clock()
+        media = self.client.recent_media(since=now - self.sla_seconds)
+        queued = 0
+
+        for item in media:
+            deadline = item["timestamp"] + self.sla_seconds
+            cursor = self.cursors.cursor(item["id"])
+            page_starts = []
+
+            while True:
+                page_starts.append(cursor)
+                comments, cursor, has_more = self.client.comments_page(item["id"], after=cursor)
+                for comment in comments:
+                    if comment["username"] == self.own_username or self.cursors.is_seen(item["id"], comment["id"]):
+                        continue
+                    if comment["id"] in self._pending:
+                        # Still waiting for a retry; its page may have moved since it was queued
+                        self._pending[comment["id"]]["page"] = len(page_starts) - 1
+                        continue
+                    comment["media_id"] = item["id"]
+                    comment["page"] = len(page_starts) - 1
+                    comment["deadline"] = deadline
+                    comment["enqueued_at"] = now
+                    comment["attempts"] = 0
+                    self._pending[comment["id"]] = comment
+                    self.queue.push(deadline, comment)
+                    queued += 1
+                if not has_more:
+                    break
+
+            self._pages[item["id"]] = (page_starts, cursor)
+
+        active = [item["id"] for item in media]
+        self.cursors.prune(active)
+        self._pages = {media_id: pages for media_id, pages in self._pages.items() if media_id in active}
+        return queued
+
+    def _post(self, item: dict, message: str) -> bool:
+        try:
+            self.client.post_reply(item["id"], message)
+        except Exception:
+            return False
+        self.cursors.mark_seen(item["media_id"], item["id"])
+        self.metrics.record(item, self.clock())
+        return True
+
+    def drain(self) -> None:
+        """Draft and post replies for everything queued, earliest deadline first, within the reply budget."""
+        remaining = self.reply_budget if self.reply_budget is not None else len(self.queue)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {}
+            while len(self.queue) and remaining > 0:
+                batch = self.queue.pop_batch(min(self.batch_size, remaining))
+                remaining -= len(batch)
+                # Drafting the next batch overlaps with the pool posting the previous one
+                replies = self.drafter.draft_batch(batch)
+                for item, reply in zip(batch, replies):
+                    futures[pool.submit(self._post, item, reply)] = item
+            wait(futures)
+
+        now = self.clock()
+        for future, item in futures.items():
+            if future.result():
+                del self._pending[item["id"]]
+                continue
+            item["attempts"] += 1
+            if item["attempts"] < self.max_attempts and now < item["deadline"]:
+                self.metrics.record_retry()
+                self.queue.push(item["deadline"], item)
+            else:
+                # Given up on: treat as seen so it isn't queued again
+                del self._pending[item["id"]]
+                self.cursors.mark_seen(item["media_id"], item["id"])
+                self.metrics.record(item, None)
+
+    def commit(self) -> None:
+        """
+        Persist replied comments and advance each media's cursor.
+
+        A cursor stops at the first page that still holds a comment waiting
+        for a retry, so the next poll reads that page again.
+        """
+        waiting: Dict[str, int] = {}
+        for item in self._pending.values():
+            waiting[item["media_id"]] = min(item["page"], waiting.get(item["media_id"], item["page"]))
+
+        for media_id, (page_starts, end_cursor) in self._pages.items():
+            if media_id in waiting:
+                self.cursors.set_cursor(media_id, page_starts[waiting[media_id]])
+            else:
+                self.cursors.set_cursor(media_id, end_cursor)
+        self.cursors.save()
+
+    def run_cycle(self) -> dict:
+        try:
+            self.poll()
+            self.drain()
+        finally:
+            # Replies already posted are recorded even if the cycle was interrupted
+            self.commit()
+        return self.metrics.summary(backlog=len(self.queue))
+
+
+def build_engagement_engine(client, preferences: dict, sla_hours: Optional[float] = None,
+                            concurrency: int = 4, llm: Optional[Callable[[str], str]] = None,
+                            **kwargs) -> "CommentEngagementEngine":
+    """
+    Engine configured from user preferences, shared by `main engage` and the tool.
+
+    Uses the ENGAGE_WITH_COMMENTS window unless `sla_hours` is given, drafts in
+    CONTENT_TONE, and skips comments written by the account itself. Without an
+    explicit `llm`, replies that don't fit a template are drafted by the model
+    in the MODEL environment variable, if one is set.
+    """
+    if sla_hours is None:
+        sla_hours = parse_sla_hours(preferences.get('engagement_strategy', {}).get('engage_with_comments'))
+    tone = preferences.get('content_preferences', {}).get('content_tone', 'professional')
+
+    if llm is None and os.getenv("MODEL"):
+        from crewai import LLM
+        llm = LLM(model=os.getenv("MODEL")).call
+
+    return CommentEngagementEngine(
+        client,
+        drafter=ReplyDrafter(llm=llm, tone=tone),
+        sla_hours=sla_hours or DEFAULT_SLA_HOURS,
+        concurrency=concurrency,
+        own_username=client.username(),
+        **kwargs
+    )
+
+
+class SimulatedClock:
+    """Clock for load tests that only moves when told to, so an hour of traffic runs in seconds."""
+
+    def __init__(self, start: Optional[float] = None):
+        self.now = time.time() if start is None else start
+        self._lock = threading.Lock()  # Advanced from the reply worker pool
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self.now += seconds
+
+    def advance_to(self, timestamp: float) -> None:
+        with self._lock:
+            self.now = max(self.now, timestamp)
+
+
+class FakeInstagramCommentAPI:
+    """
+    In-memory stand-in for InstagramCommentClient, used for load testing.
+
+    Media are published at staggered ages across the SLA window and comments
+    arrive through `add_comments`. Pages are cursor-based like the Graph API.
+
+    With a SimulatedClock, timestamps come from that clock and every API call
+    advances it by `latency` instead of sleeping.
+    """
+
+    def __init__(self, media_count: int = 10, sla_hours: float = DEFAULT_SLA_HOURS,
+                 latency: float = 0.005, page_size: int = 50, failure_rate: float = 0.0, seed: int = 0,
+                 clock: Optional[SimulatedClock] = None):
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.page_size = page_size
+        self.failure_rate = failure_rate
+        self.clock = clock
+        self.window = sla_hours * 3600
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+        now = self._now()
+        window = self.window
+        self.media = [
+            {"id": f"media_{i}", "timestamp": now - window * (i + 0.5) / media_count}
+            for i in range(media_count)
+        ]
+        self.comments: Dict[str, List[dict]] = {m["id"]: [] for m in self.media}
+        self.replies: Dict[str, int] = {}
+
+    def _now(self) -> float:
+        return self.clock() if self.clock else time.time()
+
+    def _call(self) -> None:
+        """Account for one API round trip."""
+        if self.clock:
+            self.clock.advance(self.latency)
+        else:
+            time.sleep(self.latency)
+
+    def add_comments(self, count: int, since: Optional[float] = None) -> None:
+        """Add `count` comments on media still inside the SLA window, timestamped between `since` and now."""
+        now = self._now()
+        since = now if since is None else since
+        texts = ["Love this!", "🔥🔥", "Great post", "How do you get started with this?",
+                 "Interesting take, but I think the tooling still has a long way to go.", "nice", "Thanks for sharing"]
+        media = [m for m in self.media if m["timestamp"] >= now - self.window] or self.media
+        for _ in range(count):
+            target = self.random.choice(media)
+            self.comments[target["id"]].append({
+                "id": f"comment_{next(self._ids)}",
+                "text": self.random.choice(texts),
+                "username": f"user_{self.random.randrange(100000)}",
+                "timestamp": self.random.uniform(since, now)
+            })
+
+    def recent_media(self, since: float) -> List[dict]:
+        return [dict(m) for m in self.media if m["timestamp"] >= since]
+
+    def username(self) -> str:
+        return "load_test_account"
+
+    def comments_page(self, media_id: str, after: Optional[str] = None,
+                      limit: int = 50) -> Tuple[List[dict], Optional[str], bool]:
+        self._call()
+        start = int(after or 0)
+        page = self.comments[media_id][start:start + min(limit, self.page_size)]
+        end = start + len(page)
+        return [dict(c) for c in page], str(end), end < len(self.comments[media_id])
+
+    def post_reply(self, comment_id: str, message: str) -> dict:
+        self._call()
+        if self.random.random() < self.failure_rate:
+            raise requests.exceptions.HTTPError("simulated failure")
+        with self._lock:
+            self.replies[comment_id] = self.replies.get(comment_id, 0) + 1
+        return {"id": f"reply_{comment_id}"}
+
+
+def run_engagement_load_test(comments_per_hour: int = 5000, media_count: int = 10, ticks: int = 12,
+                             concurrency: int = 8, replies_per_second: float = 1.0,
+                             failure_rate: float = 0.0) -> dict:
+    """
+    Replay an hour of comment traffic against FakeInstagramCommentAPI on a simulated clock.
+
+    The hour is split into `ticks` polling cycles. Each tick's comments arrive
+    spread over its interval and are polled at its end. Every API call takes
+    1 / `replies_per_second` simulated seconds, and a cycle may only attempt
+    as many replies as fit in one tick, so when comments outpace that rate a
+    backlog builds up and deadlines are missed. Reports the SLA hit rate and
+    queue lag in simulated time, the backlog, how many comments were never
+    answered and how many got more than one reply. `failure_rate` makes that
+    share of reply attempts fail, to exercise retries.
+    """
+    clock = SimulatedClock()
+    tick_seconds = 3600 / ticks
+    api = FakeInstagramCommentAPI(media_count=media_count, latency=1 / replies_per_second,
+                                  failure_rate=failure_rate, clock=clock)
+    engine = CommentEngagementEngine(
+        api,
+        concurrency=concurrency,
+        cursor_store=CommentCursorStore(path=None),
+        clock=clock,
+        reply_budget=int(replies_per_second * tick_seconds)
+    )
+
+    per_tick = comments_per_hour // ticks
+    simulated_start = clock()
+    started = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        clock.advance_to(simulated_start + tick * tick_seconds)
+        api.add_comments(per_tick, since=clock() - tick_seconds)
+        engine.run_cycle()
+    elapsed = time.perf_counter() - started
+    simulated = clock() - simulated_start
+
+    summary = engine.metrics.summary(backlog=len(engine.queue))
+    summary.update({
+        "comments": per_tick * ticks,
+        "simulated_seconds": round(simulated, 1),
+        "elapsed_seconds": round(elapsed, 3),
+        "replies_per_second": round(summary["replied"] / simulated, 2) if simulated else 0.0,
+        "duplicate_replies": sum(count - 1 for count in api.replies.values() if count > 1),
+        "unanswered": sum(len(comments) for comments in api.comments.values()) - len(api.replies)
+    })
+    return summary
+
+
+class InstagramCommentEngagementInput(BaseModel):
+    """Input schema for Instagram Comment Engagement Tool."""
+    sla_hours: Optional[float] = Field(None, description="Reply window after a post is published, in hours; defaults to ENGAGE_WITH_COMMENTS")
+    concurrency: Optional[int] = Field(4, description="Maximum number of replies posted in parallel")
+
+class InstagramCommentEngagementTool(BaseTool):
+    name: str = "Instagram Comment Engagement Tool"
+    description: str = (
+        "Replies to new comments on recently published posts, earliest SLA deadline first. "
+        "Returns the SLA hit rate and queue lag for the cycle."
+    )
+    args_schema: Type[BaseModel] = InstagramCommentEngagementInput
+
+    def _run(self, sla_hours: Optional[float] = None, concurrency: Optional[int] = 4) -> str:
+        """Run a single poll-and-reply cycle with the same settings as `main engage`."""
+        from instaagent.main import load_user_preferences
+
+        try:
+            engine = build_engagement_engine(
+                InstagramCommentClient(),
+                load_user_preferences(),
+                sla_hours=sla_hours,
+                concurrency=concurrency or 4
+            )
+            return f"Comment engagement cycle finished: {json.dumps(engine.run_cycle())}"
+        except FileNotFoundError:
+            return "No authentication token found. Please authenticate first."
+        except requests.exceptions.RequestException as e:
+            return f"Comment engagement failed: {str(e)}"
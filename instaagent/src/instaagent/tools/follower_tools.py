@@ -0,0 +1,540 @@
+from crewai.tools import BaseTool
+from typing import Type, List, Optional, Callable, Dict, Tuple
+from pydantic import BaseModel, Field
+from collections import deque
+import numpy as np
+import requests
+import json
+import os
+import re
+import time
+
+GRAPH_API_URL = "https://graph.instagram.com"
+
+# Instagram usernames only use these characters; index 0 is reserved for padding
+USERNAME_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789._"
+USERNAME_WIDTH = 30
+
+_CHAR_INDEX = np.zeros(256, dtype=np.int8)
+for _i, _c in enumerate(USERNAME_ALPHABET):
+    _CHAR_INDEX[ord(_c)] = _i + 1
+_DIGIT_MASK = np.zeros(len(USERNAME_ALPHABET) + 1, dtype=bool)
+_DIGIT_MASK[[USERNAME_ALPHABET.index(d) + 1 for d in "0123456789"]] = True
+
+BIO_SPAM_PATTERN = re.compile(
+    r"(dm\s*(me|for)|promo|giveaway|free\s+followers|crypto|forex|onlyfans|link\s+in\s+bio|earn\s+\$|whatsapp)",
+    re.IGNORECASE
+)
+
+FEATURE_NAMES = [
+    "log_followers",
+    "log_following",
+    "following_ratio",
+    "log_posts",
+    "username_entropy",
+    "username_digit_fraction",
+    "bio_empty",
+    "bio_spam"
+]
+
+
+def parse_auto_follow_back(preference: Optional[str]) -> bool:
+    """AUTO_FOLLOW_BACK is enabled by any value starting with "yes"."""
+    return bool(preference) and preference.strip().lower().startswith("yes")
+
+
+def username_features(usernames: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shannon entropy and digit fraction for a batch of usernames.
+
+    Usernames are packed into a fixed-width byte matrix and mapped onto the
+    username alphabet, so the per-character counting runs in NumPy rather than
+    in a Python loop per profile.
+    """
+    n = len(usernames)
+    packed = np.array([u.lower().encode("ascii", "ignore")[:USERNAME_WIDTH] for u in usernames],
+                      dtype=f"S{USERNAME_WIDTH}")
+    codes = _CHAR_INDEX[packed.view(np.uint8).reshape(n, USERNAME_WIDTH)]
+
+    # One bincount over (row, character) pairs gives the per-username histograms
+    width = len(USERNAME_ALPHABET) + 1
+    flat = (np.arange(n)[:, None] * width + codes).ravel()
+    counts = np.bincount(flat, minlength=n * width).reshape(n, width)[:, 1:]  # Drop padding / unknown
+
+    lengths = counts.sum(axis=1, keepdims=True)
+    safe_lengths = np.maximum(lengths, 1)
+    p = counts / safe_lengths
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+    digit_fraction = counts[:, _DIGIT_MASK[1:]].sum(axis=1) / safe_lengths[:, 0]
+    return entropy, digit_fraction
+
+
+def extract_features(profiles: List[dict]) -> np.ndarray:
+    """Turn a page of follower profiles into an (n, len(FEATURE_NAMES)) float matrix."""
+    n = len(profiles)
+    if n == 0:
+        return np.zeros((0, len(FEATURE_NAMES)))
+
+    followers = np.fromiter((p.get("followers_count") or 0 for p in profiles), dtype=np.float64, count=n)
+    following = np.fromiter((p.get("follows_count") or 0 for p in profiles), dtype=np.float64, count=n)
+    posts = np.fromiter((p.get("media_count") or 0 for p in profiles), dtype=np.float64, count=n)
+    bios = [p.get("biography") or "" for p in profiles]
+
+    entropy, digit_fraction = username_features([p.get("username") or "" for p in profiles])
+    bio_empty = np.fromiter((not b.strip() for b in bios), dtype=np.float64, count=n)
+    bio_spam = np.fromiter((BIO_SPAM_PATTERN.search(b) is not None for b in bios), dtype=np.float64, count=n)
+
+    return np.column_stack([
+        np.log1p(followers),
+        np.log1p(following),
+        np.log1p(following / (followers + 1)),
+        np.log1p(posts),
+        entropy,
+        digit_fraction,
+        bio_empty,
+        bio_spam
+    ])
+
+
+class BotScorer:
+    """
+    Logistic rules engine over the features from `extract_features`.
+
+    The default weights encode the usual bot signals: following far more
+    accounts than follow back, few or no posts, random-looking or digit-heavy
+    usernames and empty or promotional bios. Pass trained weights to swap in a
+    fitted model without changing the pipeline.
+    """
+
+    default_weights = np.array([
+        -0.35,  # log_followers
+        0.15,   # log_following
+        1.6,    # following_ratio
+        -0.6,   # log_posts
+        0.45,   # username_entropy
+        3.0,    # username_digit_fraction
+        1.0,    # bio_empty
+        2.5     # bio_spam
+    ])
+    default_bias = -1.5
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[float] = None, threshold: float = 0.5):
+        self.weights = self.default_weights if weights is None else np.asarray(weights, dtype=np.float64)
+        self.bias = self.default_bias if bias is None else bias
+        self.threshold = threshold
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Bot probability for every row of the feature matrix."""
+        return 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+    def is_bot(self, scores: np.ndarray) -> np.ndarray:
+        return scores >= self.threshold
+
+
+class BotScoreCache:
+    """Bot scores per user id with a TTL, persisted in data/bot_scores.json."""
+
+    def __init__(self, path: Optional[str] = "data/bot_scores.json", ttl_seconds: float = 7 * 24 * 3600,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._scores: Dict[str, List[float]] = {}
+
+        if path:
+            try:
+                with open(path, "r") as f:
+                    self._scores = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._scores = {}
+
+    def get(self, user_id: str) -> Optional[float]:
+        entry = self._scores.get(user_id)
+        if entry is None or entry[1] < self.clock():
+            return None
+        return entry[0]
+
+    def put_many(self, user_ids: List[str], scores: np.ndarray) -> None:
+        expires_at = self.clock() + self.ttl
+        for user_id, score in zip(user_ids, scores.tolist()):
+            self._scores[user_id] = [score, expires_at]
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = self.clock()
+        # Drop expired entries so the file doesn't grow without bound
+        self._scores = {k: v for k, v in self._scores.items() if v[1] >= now}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._scores, f)
+        os.replace(tmp_path, self.path)
+
+
+class FollowerBackfill:
+    """
+    Where unfinished follower scans resume, persisted in data/follower_backfill.json.
+
+    A scan that runs out of pages (`max_pages`) or is interrupted leaves its
+    cursor here, and later runs keep paging from it until they reach a page
+    that was already screened or the end of the list. Without a stored state,
+    one scan is queued that pages all the way to the end, so followers skipped
+    by earlier runs are screened once.
+    """
+
+    def __init__(self, path: Optional[str] = "data/follower_backfill.json"):
+        self.path = path
+        self.pending: List[dict] = [{"after": None, "to_end": True}]
+
+        if path:
+            try:
+                with open(path, "r") as f:
+                    self.pending = json.load(f).get("pending", [])
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pending": self.pending}, f)
+        os.replace(tmp_path, self.path)
+
+
+class FollowQueue:
+    """
+    Follow-back actions behind a token bucket.
+
+    Pending and already-followed ids are persisted in data/follow_queue.json,
+    so a rate-limited backlog carries over to the next run and nobody is
+    followed twice.
+    """
+
+    def __init__(self, follow: Callable[[str], object], follows_per_hour: int = 20,
+                 path: Optional[str] = "data/follow_queue.json", clock: Callable[[], float] = time.time):
+        self.follow = follow
+        self.rate = follows_per_hour / 3600.0
+        self.capacity = max(1, follows_per_hour)
+        self.path = path
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated_at = clock()
+        self.pending = deque()
+        self.followed = set()
+
+        if path:
+            try:
+                with open(path, "r") as f:
+                    state = json.load(f)
+                self.pending.extend(state.get("pending", []))
+                self.followed.update(state.get("followed", []))
+                # Carry the bucket over so back-to-back runs can't exceed the rate
+                self.tokens = min(self.tokens, state.get("tokens", self.tokens))
+                self.updated_at = state.get("updated_at", self.updated_at)
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+        self._queued = set(self.pending)
+
+    def enqueue(self, user_ids: List[str]) -> int:
+        added = 0
+        for user_id in user_ids:
+            if user_id in self.followed or user_id in self._queued:
+                continue
+            self.pending.append(user_id)
+            self._queued.add(user_id)
+            added += 1
+        return added
+
+    def process(self) -> int:
+        """Follow as many pending users as the bucket currently allows."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        done = 0
+        while self.pending and self.tokens >= 1:
+            user_id = self.pending[0]
+            try:
+                self.follow(user_id)
+            except requests.exceptions.RequestException:
+                # Leave it at the head of the queue for the next run
+                break
+            self.pending.popleft()
+            self._queued.discard(user_id)
+            self.followed.add(user_id)
+            self.tokens -= 1
+            done += 1
+        return done
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "pending": list(self.pending),
+                "followed": sorted(self.followed),
+                "tokens": self.tokens,
+                "updated_at": self.updated_at
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+class InstagramFollowerClient:
+    """Graph API client for paging through followers and following back."""
+
+    profile_fields = "id,username,biography,followers_count,follows_count,media_count"
+
+    def __init__(self, access_token: Optional[str] = None, user_id: Optional[str] = None, timeout: int = 10):
+        if access_token is None:
+            # Fall back to the tokens stored by InstagramAuthTool
+            with open("credentials/instagram_tokens.json", "r") as f:
+                tokens = json.load(f)
+            access_token = tokens["access_token"]
+            user_id = user_id or tokens.get("user_id")
+
+        self.access_token = access_token
+        self.user_id = user_id or "me"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def followers_page(self, after: Optional[str] = None,
+                       limit: int = 100) -> Tuple[List[dict], Optional[str], bool]:
+        """Return (profiles, cursor, has_more) for one page of followers."""
+        params = {"fields": self.profile_fields, "limit": limit, "access_token": self.access_token}
+        if after:
+            params["after"] = after
+        response = self.session.get(f"{GRAPH_API_URL}/{self.user_id}/followers", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        page = response.json()
+
+        paging = page.get("paging", {})
+        cursor = paging.get("cursors", {}).get("after", after)
+        return page.get("data", []), cursor, "next" in paging
+
+    def follow(self, target_id: str) -> dict:
+        response = self.session.post(
+            f"{GRAPH_API_URL}/{self.user_id}/follows",
+            data={"target_id": target_id, "access_token": self.access_token},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class FollowerScreeningPipeline:
+    """
+    Screens followers a page at a time and queues follow-backs for non-bots.
+
+    Cached scores are reused; the rest of the page is featurized and scored in
+    one matrix operation. Followers are listed newest first, so paging stops at
+    the first page without any follower that hasn't been scored yet. Once cached
+    scores expire, the next run pages further back and rescores them.
+
+    A scan cut short by `max_pages` or an error would leave older followers
+    behind that later runs never reach, so its cursor is kept in the backfill
+    state and resumed after the newest followers have been screened. Progress
+    is saved even if the run fails.
+    """
+
+    def __init__(self, client, scorer: Optional[BotScorer] = None, cache: Optional[BotScoreCache] = None,
+                 follow_queue: Optional[FollowQueue] = None, backfill: Optional[FollowerBackfill] = None,
+                 page_size: int = 100):
+        self.client = client
+        self.scorer = scorer or BotScorer()
+        self.cache = cache if cache is not None else BotScoreCache()
+        self.follow_queue = follow_queue if follow_queue is not None else FollowQueue(client.follow)
+        self.backfill = backfill if backfill is not None else FollowerBackfill()
+        self.page_size = page_size
+
+    def screen_page(self, profiles: List[dict]) -> Tuple[List[str], List[str]]:
+        """Split a page into (human_ids, bot_ids)."""
+        ids = [str(p["id"]) for p in profiles]
+        scores = np.empty(len(ids))
+        uncached = []
+
+        for index, user_id in enumerate(ids):
+            cached = self.cache.get(user_id)
+            if cached is None:
+                uncached.append(index)
+            else:
+                scores[index] = cached
+
+        if uncached:
+            fresh = self.scorer.score(extract_features([profiles[i] for i in uncached]))
+            scores[uncached] = fresh
+            self.cache.put_many([ids[i] for i in uncached], fresh)
+
+        bots = self.scorer.is_bot(scores)
+        humans = [user_id for user_id, bot in zip(ids, bots) if not bot]
+        flagged = [user_id for user_id, bot in zip(ids, bots) if bot]
+        return humans, flagged
+
+    def _scan(self, scan: dict, stats: dict, max_pages: Optional[int]) -> str:
+        """
+        Page from `scan["after"]`, advancing it as pages are screened.
+
+        Returns "end" at the end of the list, "known" at a page with nothing
+        left to score (unless the scan has to reach the end) and "budget" when
+        `max_pages` runs out first.
+        """
+        while max_pages is None or stats["pages"] < max_pages:
+            profiles, cursor, has_more = self.client.followers_page(after=scan["after"], limit=self.page_size)
+            unseen = sum(1 for p in profiles if self.cache.get(str(p["id"])) is None)
+            humans, flagged = self.screen_page(profiles)
+            stats["screened"] += len(profiles)
+            stats["new"] += unseen
+            stats["bots"] += len(flagged)
+            stats["queued"] += self.follow_queue.enqueue(humans)
+            stats["pages"] += 1
+            scan["after"] = cursor
+            if not has_more:
+                return "end"
+            if not unseen and not scan["to_end"]:
+                # Everything from here on was screened by an earlier run
+                return "known"
+        return "budget"
+
+    def run(self, max_pages: Optional[int] = None) -> dict:
+        stats = {"pages": 0, "screened": 0, "new": 0, "bots": 0, "queued": 0, "followed": 0}
+        # Newest followers first; the scan is registered up front so an error midway leaves its cursor behind
+        head = {"after": None, "to_end": False}
+        self.backfill.pending.insert(0, head)
+
+        try:
+            for scan in list(self.backfill.pending):
+                if max_pages is not None and stats["pages"] >= max_pages:
+                    break
+                outcome = self._scan(scan, stats, max_pages)
+                if outcome == "end" and scan is head:
+                    # The whole list was just screened, so nothing is left behind
+                    self.backfill.pending = []
+                    break
+                if outcome != "budget":
+                    self.backfill.pending.remove(scan)
+
+            stats["followed"] = self.follow_queue.process()
+        finally:
+            self.cache.save()
+            self.follow_queue.save()
+            self.backfill.save()
+
+        stats["pending"] = len(self.follow_queue.pending)
+        stats["backfill_scans"] = len(self.backfill.pending)
+        return stats
+
+
+class FakeFollowerAPI:
+    """
+    In-memory follower list with synthetic human and bot profiles, for benchmarking.
+
+    Like the Graph API, pages list the most recent followers first.
+    """
+
+    def __init__(self, count: int = 100000, bot_fraction: float = 0.3, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.is_bot = rng.random(count) < bot_fraction
+        letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+        words = ["data", "tech", "anna", "mike", "dev", "studio", "coffee", "travels", "ml", "startup"]
+
+        self.profiles = []
+        for i in range(count):
+            if self.is_bot[i]:
+                username = "".join(rng.choice(letters, 6)) + str(rng.integers(1000, 99999))
+                profile = {
+                    "followers_count": int(rng.integers(0, 60)),
+                    "follows_count": int(rng.integers(800, 7500)),
+                    "media_count": int(rng.integers(0, 3)),
+                    "biography": rng.choice(["", "DM for promo 💰", "Free followers! link in bio", ""])
+                }
+            else:
+                username = f"{rng.choice(words)}_{rng.choice(words)}"
+                profile = {
+                    "followers_count": int(rng.integers(80, 5000)),
+                    "follows_count": int(rng.integers(50, 900)),
+                    "media_count": int(rng.integers(5, 400)),
+                    "biography": rng.choice(["Engineer. Coffee lover.", "Building things with data", "", "Photographer 📷"])
+                }
+            profile.update({"id": str(i), "username": username})
+            self.profiles.append(profile)
+        self.follows: List[str] = []
+
+    def add_followers(self, count: int) -> None:
+        """New followers, copied from existing profiles under fresh ids."""
+        sources = np.arange(count) % len(self.profiles)
+        for index in sources.tolist():
+            self.profiles.append(dict(self.profiles[index], id=str(len(self.profiles))))
+        self.is_bot = np.concatenate([self.is_bot, self.is_bot[sources]])
+
+    def followers_page(self, after: Optional[str] = None,
+                       limit: int = 100) -> Tuple[List[dict], Optional[str], bool]:
+        # Profiles are stored oldest first. Like the Graph API's, the cursor points
+        # at a follower rather than an offset, so it stays valid as new ones arrive
+        end = len(self.profiles) if after is None else int(after)
+        start = max(0, end - limit)
+        return self.profiles[start:end][::-1], str(start), start > 0
+
+    def follow(self, target_id: str) -> dict:
+        self.follows.append(target_id)
+        return {"success": True}
+
+
+def run_screening_benchmark(count: int = 100000, page_size: int = 1000) -> dict:
+    """Screen `count` synthetic followers and report throughput and accuracy."""
+    api = FakeFollowerAPI(count=count)
+    pipeline = FollowerScreeningPipeline(
+        api,
+        cache=BotScoreCache(path=None),
+        follow_queue=FollowQueue(api.follow, path=None),
+        backfill=FollowerBackfill(path=None),
+        page_size=page_size
+    )
+
+    started = time.perf_counter()
+    stats = pipeline.run()
+    elapsed = time.perf_counter() - started
+
+    # Re-score everything once more to check the labels against ground truth
+    scores = pipeline.scorer.score(extract_features(api.profiles))
+    predicted = pipeline.scorer.is_bot(scores)
+
+    stats.update({
+        "elapsed_seconds": round(elapsed, 3),
+        "profiles_per_second": round(count / elapsed) if elapsed else 0,
+        "accuracy": round(float((predicted == api.is_bot).mean()), 4)
+    })
+    return stats
+
+
+class InstagramFollowBackInput(BaseModel):
+    """Input schema for Instagram Follow Back Tool."""
+    max_pages: Optional[int] = Field(None, description="Maximum number of follower pages to screen")
+    follows_per_hour: Optional[int] = Field(20, description="Rate limit for follow-back actions")
+
+class InstagramFollowBackTool(BaseTool):
+    name: str = "Instagram Follow Back Tool"
+    description: str = (
+        "Screens new followers for bots and follows back the accounts that look genuine, "
+        "respecting a follow rate limit."
+    )
+    args_schema: Type[BaseModel] = InstagramFollowBackInput
+
+    def _run(self, max_pages: Optional[int] = None, follows_per_hour: Optional[int] = 20) -> str:
+        """Screen followers and process the follow-back queue."""
+        try:
+            client = InstagramFollowerClient()
+            pipeline = FollowerScreeningPipeline(
+                client,
+                follow_queue=FollowQueue(client.follow, follows_per_hour=follows_per_hour or 20)
+            )
+            return f"Follower screening finished: {json.dumps(pipeline.run(max_pages=max_pages))}"
+        except FileNotFoundError:
+            return "No authentication token found. Please authenticate first."
+        except requests.exceptions.RequestException as e:
+            return f"Follower screening failed: {str(e)}"
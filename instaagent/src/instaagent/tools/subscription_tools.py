@@ -8,11 +8,6 @@ from datetime import datetime
 import time
 import random
 
-class InstagramSubscriptionInput(BaseModel):
-    """Input schema for Instagram Subscription Tool."""
-    hashtags: Optional[List[str]] = Field(default=None, description="List of hashtags to monitor")
-    users: Optional[List[str]] = Field(default=None, description="List of usernames to monitor")
-    
 class InstagramSubscriptionInput(BaseModel):
     """Input schema for Instagram Subscription Tool."""
     hashtags: Optional[List[str]] = Field(default=None, description="List of hashtags to monitor")
@@ -20,3 +15,82 @@ class InstagramSubscriptionInput(BaseModel):
     
     class Config:
         arbitrary_types_allowed = True
+
+class InstagramSubscriptionTool(BaseTool):
+    name: str = "Instagram Subscription Tool"
+    description: str = (
+        "Subscribes to Instagram hashtags and accounts to monitor. Resolves hashtag IDs "
+        "through the Graph API and keeps the subscription list up to date."
+    )
+    args_schema: Type[BaseModel] = InstagramSubscriptionInput
+
+    def _run(self, hashtags: Optional[List[str]] = None, users: Optional[List[str]] = None) -> str:
+        """
+        Add hashtags and accounts to the monitored subscription list.
+
+        Hashtags are resolved to their Graph API IDs so their recent media can be
+        polled later; accounts are stored by username.
+        """
+        try:
+            return self.subscribe(hashtags, users)
+        except FileNotFoundError:
+            return "No authentication token found. Please authenticate first."
+        except requests.exceptions.RequestException as e:
+            return f"Subscription failed: {str(e)}"
+
+    def subscribe(self, hashtags: Optional[List[str]] = None, users: Optional[List[str]] = None) -> str:
+        """
+        Like `_run`, but raises instead of returning an error message when there
+        is no token or the Graph API call fails. Used by the worker's monitor jobs.
+        """
+        # Load tokens
+        with open("credentials/instagram_tokens.json", "r") as f:
+            tokens = json.load(f)
+
+        subscriptions = self._load_subscriptions()
+        added = []
+
+        for hashtag in hashtags or []:
+            name = hashtag.strip().lstrip("#").lower()
+            if not name or name in subscriptions["hashtags"]:
+                continue
+
+            response = requests.get(
+                "https://graph.facebook.com/ig_hashtag_search",
+                params={"user_id": tokens.get("user_id"), "q": name, "access_token": tokens["access_token"]}
+            )
+            response.raise_for_status()
+            data = response.json().get("data", [])
+
+            subscriptions["hashtags"][name] = {
+                "id": data[0]["id"] if data else None,
+                "subscribed_at": datetime.now().isoformat()
+            }
+            added.append(f"#{name}")
+
+        for user in users or []:
+            username = user.strip().lstrip("@").lower()
+            if not username or username in subscriptions["users"]:
+                continue
+            subscriptions["users"][username] = {"subscribed_at": datetime.now().isoformat()}
+            added.append(f"@{username}")
+
+        self._save_subscriptions(subscriptions)
+
+        if not added:
+            return "Subscription list is already up to date."
+        return f"Subscribed to: {', '.join(added)}"
+
+    def _load_subscriptions(self) -> dict:
+        """Load the current subscription list."""
+        try:
+            with open("data/subscriptions.json", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"hashtags": {}, "users": {}}
+
+    def _save_subscriptions(self, subscriptions: dict) -> None:
+        """Save the subscription list."""
+        os.makedirs("data", exist_ok=True)
+        with open("data/subscriptions.json", "w") as f:
+            json.dump(subscriptions, f)
@@ -0,0 +1,630 @@
+"""
+Shared work queue so several instaagent workers can split the load.
+
+Jobs (publish, refresh, monitor, caption) are partitioned by a hash of their
+account. A worker leases jobs for a limited time, heartbeats while a job runs
+and acks it when done; a lease that is not renewed expires and the job goes
+back to the queue for another worker. Enqueueing with an idempotency key
+that already exists is a no-op, so the same post is never queued twice.
+
+Publish jobs are queued when a post is scheduled or a calendar is planned,
+due at the post's slot. `main enqueue` queues the recurring refresh and
+monitor jobs, once for all accounts since they share the stored token, and
+backfills publish jobs for stored posts.
+
+The default backend is a SQLite file under data/. Set WORK_QUEUE_URL to a
+redis:// URL to use Redis instead (requires the `redis` package).
+"""
+
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+JOB_KINDS = ("publish", "refresh", "monitor", "caption")
+NUM_PARTITIONS = 64
+DEFAULT_QUEUE_URL = "sqlite:///data/work_queue.db"
+# Account that jobs acting on state shared by all accounts (the stored token,
+# the subscription list) are queued under
+SHARED_ACCOUNT = "shared"
+
+
+def partition_for(account: str, num_partitions: int = NUM_PARTITIONS) -> int:
+    """Stable partition for an account, identical across processes and hosts."""
+    digest = hashlib.sha1(account.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % num_partitions
+
+
+def partitions_for_worker(index: int, count: int, num_partitions: int = NUM_PARTITIONS) -> List[int]:
+    """Partitions owned by worker `index` out of `count`, assigned round-robin."""
+    return [p for p in range(num_partitions) if p % count == index]
+
+
+class SQLiteWorkQueue:
+    """
+    Work queue backed by a single SQLite file.
+
+    Leasing happens inside a BEGIN IMMEDIATE transaction, so two processes
+    can never lease the same job. WAL mode lets readers proceed while a
+    lease is being written.
+    """
+
+    def __init__(self, path: str = "data/work_queue.db", num_partitions: int = NUM_PARTITIONS,
+                 max_attempts: int = 5):
+        self.path = path
+        self.num_partitions = num_partitions
+        self.max_attempts = max_attempts
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()  # Heartbeats run on a separate thread
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                kind TEXT NOT NULL,
+                account TEXT NOT NULL,
+                partition INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (partition, status, available_at);
+        """)
+
+    def enqueue(self, kind: str, account: str, payload: dict, key: Optional[str] = None,
+                available_at: Optional[float] = None) -> Optional[str]:
+        """Queue a job. Returns its id, or None if a job with the same key already exists."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, key, kind, account, partition, payload, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key or job_id, kind, account, partition_for(account, self.num_partitions),
+                 json.dumps(payload), available_at or time.time(), datetime.now().isoformat())
+            )
+        return job_id if cursor.rowcount else None
+
+    def enqueue_many(self, jobs: List[dict]) -> int:
+        """
+        Queue several jobs in one transaction.
+
+        Each job is a dict with `kind`, `account`, `payload` and optionally `key`
+        and `available_at`. Returns how many were new.
+        """
+        now, created_at = time.time(), datetime.now().isoformat()
+        rows = []
+        for job in jobs:
+            job_id = uuid.uuid4().hex
+            rows.append((job_id, job.get("key") or job_id, job["kind"], job["account"],
+                         partition_for(job["account"], self.num_partitions), json.dumps(job["payload"]),
+                         job.get("available_at") or now, created_at))
+
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (id, key, kind, account, partition, payload, available_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def lease(self, owner: str, partitions: Optional[List[int]] = None, limit: int = 1,
+              lease_seconds: float = 60.0) -> List[dict]:
+        """Lease up to `limit` ready jobs, including jobs whose previous lease expired."""
+        partitions = partitions if partitions is not None else list(range(self.num_partitions))
+        placeholders = ",".join("?" * len(partitions))
+        now = time.time()
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs that keep losing their lease are given up on rather than retried forever
+                self.conn.execute(
+                    f"UPDATE jobs SET status = 'dead', error = 'lease expired' "
+                    f"WHERE partition IN ({placeholders}) AND status = 'leased' "
+                    f"AND lease_expires < ? AND attempts >= ?",
+                    (*partitions, now, self.max_attempts)
+                )
+                rows = self.conn.execute(
+                    f"SELECT id FROM jobs WHERE partition IN ({placeholders}) AND ("
+                    f"(status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?)"
+                    f") ORDER BY available_at LIMIT ?",
+                    (*partitions, now, now, limit)
+                ).fetchall()
+
+                jobs = []
+                for (job_id,) in rows:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                        "lease_token = id || ':' || (attempts + 1), lease_expires = ? WHERE id = ?",
+                        (owner, now + lease_seconds, job_id)
+                    )
+                    jobs.append(self._get(job_id))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def _get(self, job_id: str) -> dict:
+        row = self.conn.execute(
+            "SELECT id, key, kind, account, partition, payload, attempts, lease_token FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        return {
+            "id": row[0],
+            "key": row[1],
+            "kind": row[2],
+            "account": row[3],
+            "partition": row[4],
+            "payload": json.loads(row[5]),
+            "attempts": row[6],
+            "lease_token": row[7]
+        }
+
+    def heartbeat(self, job: dict, lease_seconds: float = 60.0) -> bool:
+        """Extend the lease. Returns False if the lease was lost to another worker."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job["id"], job["lease_token"])
+            )
+        return cursor.rowcount == 1
+
+    def ack(self, job: dict, result: Optional[str] = None) -> bool:
+        """Mark a leased job done. Returns False if the lease was lost in the meantime."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (result, job["id"], job["lease_token"])
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: dict, error: str, retry_delay: float = 30.0) -> None:
+        """Release a failed job for retry, or mark it dead after `max_attempts`."""
+        status = "dead" if job["attempts"] >= self.max_attempts else "queued"
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_expires = NULL "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (status, error, time.time() + retry_delay, job["id"], job["lease_token"])
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# Redis keeps each job in a hash, ready jobs in a per-partition sorted set scored
+# by available_at, and active leases in a per-partition sorted set scored by
+# expiry. The scripts below keep every state transition atomic.
+_REDIS_ENQUEUE = """
+local prefix, job_id, key = ARGV[1], ARGV[2], ARGV[3]
+if redis.call('HSETNX', prefix .. ':keys', key, job_id) == 0 then
+    return 0
+end
+redis.call('HSET', prefix .. ':job:' .. job_id, 'id', job_id, 'key', key, 'kind', ARGV[4], 'account', ARGV[5],
+           'partition', ARGV[6], 'payload', ARGV[7], 'status', 'queued', 'attempts', 0, 'available_at', ARGV[8])
+redis.call('ZADD', prefix .. ':ready:' .. ARGV[6], ARGV[8], job_id)
+return 1
+"""
+
+_REDIS_LEASE = """
+local prefix, now, lease, owner = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4]
+local limit, max_attempts = tonumber(ARGV[5]), tonumber(ARGV[6])
+local leased = {}
+local count = 0
+for i = 7, #ARGV do
+    if count >= limit then break end
+    local p = ARGV[i]
+    local ready, leases = prefix .. ':ready:' .. p, prefix .. ':leases:' .. p
+
+    -- Expired leases go back to the ready set, or die after too many attempts
+    for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', leases, '-inf', '(' .. now)) do
+        local job = prefix .. ':job:' .. job_id
+        redis.call('ZREM', leases, job_id)
+        if tonumber(redis.call('HGET', job, 'attempts')) >= max_attempts then
+            redis.call('HSET', job, 'status', 'dead', 'error', 'lease expired')
+            redis.call('INCR', prefix .. ':count:dead')
+        else
+            redis.call('HSET', job, 'status', 'queued')
+            redis.call('ZADD', ready, now, job_id)
+        end
+    end
+
+    for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', ready, '-inf', now, 'LIMIT', 0, limit - count)) do
+        local job = prefix .. ':job:' .. job_id
+        local attempts = redis.call('HINCRBY', job, 'attempts', 1)
+        local token = job_id .. ':' .. attempts
+        redis.call('ZREM', ready, job_id)
+        redis.call('HSET', job, 'status', 'leased', 'lease_owner', owner, 'lease_token', token,
+                   'lease_expires', now + lease)
+        redis.call('ZADD', leases, now + lease, job_id)
+        table.insert(leased, job_id)
+        count = count + 1
+    end
+end
+return leased
+"""
+
+_REDIS_HEARTBEAT = """
+local prefix, job_id, token, expires = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local job = prefix .. ':job:' .. job_id
+if redis.call('HGET', job, 'lease_token') ~= token or redis.call('HGET', job, 'status') ~= 'leased' then
+    return 0
+end
+redis.call('HSET', job, 'lease_expires', expires)
+redis.call('ZADD', prefix .. ':leases:' .. redis.call('HGET', job, 'partition'), expires, job_id)
+return 1
+"""
+
+_REDIS_FINISH = """
+local prefix, job_id, token, status = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local job = prefix .. ':job:' .. job_id
+if redis.call('HGET', job, 'lease_token') ~= token or redis.call('HGET', job, 'status') ~= 'leased' then
+    return 0
+end
+local p = redis.call('HGET', job, 'partition')
+redis.call('ZREM', prefix .. ':leases:' .. p, job_id)
+redis.call('HSET', job, 'status', status, ARGV[5], ARGV[6])
+if status == 'queued' then
+    redis.call('ZADD', prefix .. ':ready:' .. p, ARGV[7], job_id)
+else
+    redis.call('INCR', prefix .. ':count:' .. status)
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """Work queue backed by Redis, for workers spread over several hosts."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "instaagent:queue",
+                 num_partitions: int = NUM_PARTITIONS, max_attempts: int = 5, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("The Redis work queue requires the `redis` package: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+
+        self.redis = client
+        self.prefix = prefix
+        self.num_partitions = num_partitions
+        self.max_attempts = max_attempts
+        self._enqueue = self.redis.register_script(_REDIS_ENQUEUE)
+        self._lease = self.redis.register_script(_REDIS_LEASE)
+        self._heartbeat = self.redis.register_script(_REDIS_HEARTBEAT)
+        self._finish = self.redis.register_script(_REDIS_FINISH)
+
+    def enqueue(self, kind: str, account: str, payload: dict, key: Optional[str] = None,
+                available_at: Optional[float] = None) -> Optional[str]:
+        job_id = uuid.uuid4().hex
+        created = self._enqueue(args=[
+            self.prefix, job_id, key or job_id, kind, account,
+            partition_for(account, self.num_partitions), json.dumps(payload), available_at or time.time()
+        ])
+        return job_id if created else None
+
+    def enqueue_many(self, jobs: List[dict]) -> int:
+        """Queue several jobs in one round trip. Returns how many were new."""
+        pipe = self.redis.pipeline()
+        for job in jobs:
+            job_id = uuid.uuid4().hex
+            self._enqueue(args=[
+                self.prefix, job_id, job.get("key") or job_id, job["kind"], job["account"],
+                partition_for(job["account"], self.num_partitions), json.dumps(job["payload"]),
+                job.get("available_at") or time.time()
+            ], client=pipe)
+        return sum(pipe.execute())
+
+    def lease(self, owner: str, partitions: Optional[List[int]] = None, limit: int = 1,
+              lease_seconds: float = 60.0) -> List[dict]:
+        partitions = partitions if partitions is not None else list(range(self.num_partitions))
+        job_ids = self._lease(args=[
+            self.prefix, time.time(), lease_seconds, owner, limit, self.max_attempts, *partitions
+        ])
+
+        jobs = []
+        for job_id in job_ids:
+            data = self.redis.hgetall(f"{self.prefix}:job:{job_id}")
+            jobs.append({
+                "id": job_id,
+                "key": data["key"],
+                "kind": data["kind"],
+                "account": data["account"],
+                "partition": int(data["partition"]),
+                "payload": json.loads(data["payload"]),
+                "attempts": int(data["attempts"]),
+                "lease_token": data["lease_token"]
+            })
+        return jobs
+
+    def heartbeat(self, job: dict, lease_seconds: float = 60.0) -> bool:
+        return bool(self._heartbeat(args=[self.prefix, job["id"], job["lease_token"], time.time() + lease_seconds]))
+
+    def ack(self, job: dict, result: Optional[str] = None) -> bool:
+        return bool(self._finish(args=[self.prefix, job["id"], job["lease_token"], "done", "result", result or ""]))
+
+    def fail(self, job: dict, error: str, retry_delay: float = 30.0) -> None:
+        status = "dead" if job["attempts"] >= self.max_attempts else "queued"
+        self._finish(args=[self.prefix, job["id"], job["lease_token"], status, "error", error,
+                           time.time() + retry_delay])
+
+    def stats(self) -> Dict[str, int]:
+        pipe = self.redis.pipeline()
+        for p in range(self.num_partitions):
+            pipe.zcard(f"{self.prefix}:ready:{p}")
+            pipe.zcard(f"{self.prefix}:leases:{p}")
+        counts = pipe.execute()
+        stats = {
+            "queued": sum(counts[0::2]),
+            "leased": sum(counts[1::2]),
+            "done": int(self.redis.get(f"{self.prefix}:count:done") or 0),
+            "dead": int(self.redis.get(f"{self.prefix}:count:dead") or 0)
+        }
+        return {status: count for status, count in stats.items() if count}
+
+    def close(self) -> None:
+        self.redis.close()
+
+
+def open_work_queue(url: Optional[str] = None):
+    """Open the queue named by `url` or WORK_QUEUE_URL (sqlite:///path or redis://...)."""
+    url = url or os.getenv("WORK_QUEUE_URL", DEFAULT_QUEUE_URL)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteWorkQueue(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported work queue URL: {url}")
+
+
+def enqueue_publish_jobs(queue, posts: List[dict], default_account: Optional[str] = None) -> int:
+    """
+    Queue one publish job per stored post, due at its scheduled time.
+
+    Posts without an image are skipped rather than queued to fail: once their
+    `image_path` is set, `main enqueue` picks them up. Jobs are keyed by post
+    id, so queueing the same post again (a re-planned calendar, a retried tool
+    call, a backfill) is a no-op. Returns how many jobs were new.
+    """
+    default_account = default_account or os.getenv("INSTAGRAM_ACCOUNT", "default")
+    jobs = []
+    for post in posts:
+        if not post.get("image_path"):
+            continue
+        scheduled_time = post.get("scheduled_time")
+        jobs.append({
+            "kind": "publish",
+            "account": post.get("account") or default_account,
+            "payload": {"post_id": post["id"]},
+            "key": f"publish:{post['id']}",
+            "available_at": datetime.fromisoformat(str(scheduled_time)).timestamp() if scheduled_time else None
+        })
+    return queue.enqueue_many(jobs) if jobs else 0
+
+
+def enqueue_maintenance_jobs(queue, preferences: dict, now: Optional[datetime] = None) -> int:
+    """
+    Queue the recurring jobs: a daily token refresh and an hourly
+    hashtag/account monitoring pass.
+
+    The access token and the subscription list are shared by all accounts, so
+    each job is queued once under SHARED_ACCOUNT rather than once per account,
+    which would have several workers refreshing the same token at the same
+    time. Keys include the day or hour, so calling this more often
+    than that (e.g. from cron every few minutes) queues each job only once.
+    Returns how many jobs were new.
+    """
+    now = now or datetime.now()
+    monitoring = preferences.get('monitoring_preferences', {})
+    monitor_payload = {
+        "hashtags": [h.strip() for h in monitoring.get('hashtags_to_monitor', '').split(',') if h.strip()],
+        "users": [u.strip() for u in monitoring.get('accounts_to_monitor', '').split(',') if u.strip()]
+    }
+
+    jobs = [{
+        "kind": "refresh",
+        "account": SHARED_ACCOUNT,
+        "payload": {},
+        "key": f"refresh:{now:%Y-%m-%d}"
+    }]
+    if monitor_payload["hashtags"] or monitor_payload["users"]:
+        jobs.append({
+            "kind": "monitor",
+            "account": SHARED_ACCOUNT,
+            "payload": monitor_payload,
+            "key": f"monitor:{now:%Y-%m-%dT%H}"
+        })
+    return queue.enqueue_many(jobs)
+
+
+def default_handlers() -> Dict[str, Callable[[dict], str]]:
+    """
+    Job handlers backed by the existing tools.
+
+    Handlers raise on failure, so the worker retries the job instead of acking
+    it; the tools' `_run` methods return errors as text for the agents, so the
+    handlers call their raising counterparts. Tools are imported lazily so the
+    queue itself stays importable without crewai.
+    """
+    from instaagent.tools.auth_tools import InstagramRefreshTokenTool
+    from instaagent.tools.content_tools import InstagramCaptionTool, publish_scheduled_post
+    from instaagent.tools.subscription_tools import InstagramSubscriptionTool
+
+    return {
+        "publish": lambda payload: publish_scheduled_post(payload["post_id"]),
+        "refresh": lambda payload: InstagramRefreshTokenTool().refresh(),
+        "monitor": lambda payload: InstagramSubscriptionTool().subscribe(**payload),
+        "caption": lambda payload: InstagramCaptionTool()._run(**payload)
+    }
+
+
+class Worker:
+    """
+    Leases jobs from a queue and runs them through their kind's handler.
+
+    While a handler runs, a background thread renews the lease every third of
+    the lease period. Handler exceptions release the job for a retry.
+    """
+
+    def __init__(self, queue, handlers: Dict[str, Callable[[dict], str]], worker_id: Optional[str] = None,
+                 partitions: Optional[List[int]] = None, lease_seconds: float = 60.0, batch_size: int = 1,
+                 poll_interval: float = 1.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.partitions = partitions
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def _heartbeat(self, job: dict, done: threading.Event) -> None:
+        while not done.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(job, self.lease_seconds):
+                return
+
+    def process(self, job: dict) -> bool:
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.queue.fail(job, f"No handler for job kind '{job['kind']}'")
+            return False
+
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        beat.start()
+        try:
+            result = handler(job["payload"])
+        except Exception as e:
+            self.queue.fail(job, str(e))
+            return False
+        finally:
+            done.set()
+            beat.join()
+        return self.queue.ack(job, None if result is None else str(result))
+
+    def run_once(self) -> int:
+        """Lease one batch and process it. Returns the number of jobs leased."""
+        jobs = self.queue.lease(self.worker_id, self.partitions, self.batch_size, self.lease_seconds)
+        for job in jobs:
+            self.process(job)
+        return len(jobs)
+
+    def run(self, stop_when_idle: bool = False, max_jobs: Optional[int] = None) -> int:
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            count = self.run_once()
+            processed += count
+            if count == 0:
+                if stop_when_idle:
+                    break
+                time.sleep(self.poll_interval)
+        return processed
+
+
+def _benchmark_worker(url: str, index: int, count: int, work_seconds: float, log_path: str) -> None:
+    """Worker process for `run_queue_benchmark`: simulates I/O-bound jobs and logs every execution."""
+    queue = open_work_queue(url)
+
+    with open(log_path, "w") as log:
+        def handler(payload: dict) -> str:
+            time.sleep(work_seconds)
+            log.write(payload["post_id"] + "\n")
+            return "ok"
+
+        worker = Worker(
+            queue,
+            {kind: handler for kind in JOB_KINDS},
+            worker_id=f"bench-{index}",
+            partitions=partitions_for_worker(index, count, queue.num_partitions),
+            batch_size=4,
+            poll_interval=0.05
+        )
+        worker.run(stop_when_idle=True)
+    queue.close()
+
+
+def run_queue_benchmark(worker_counts: List[int] = (1, 2, 4, 8), jobs: int = 400, accounts: int = 50,
+                        work_ms: float = 20.0, url: Optional[str] = None) -> List[dict]:
+    """
+    Throughput versus worker process count, with a duplicate-execution check.
+
+    Each round queues `jobs` publish jobs spread over `accounts` accounts (plus a
+    second enqueue of every job to exercise key deduplication), then drains the
+    queue with N worker processes. Without `url`, every round uses a fresh
+    SQLite file.
+    """
+    import multiprocessing
+
+    results = []
+    for count in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            round_url = url or f"sqlite:///{os.path.join(tmp, 'queue.db')}"
+            queue = open_work_queue(round_url)
+            # Keys are unique per round so a shared Redis queue can be reused across rounds
+            round_tag = uuid.uuid4().hex[:8]
+            for n in range(jobs):
+                account = f"account_{n % accounts}"
+                payload = {"post_id": f"{account}:{n}"}
+                queue.enqueue("publish", account, payload, key=f"publish:{round_tag}:{account}:{n}")
+                queue.enqueue("publish", account, payload, key=f"publish:{round_tag}:{account}:{n}")
+
+            logs = [os.path.join(tmp, f"worker-{i}.log") for i in range(count)]
+            processes = [
+                multiprocessing.Process(
+                    target=_benchmark_worker,
+                    args=(round_url, i, count, work_ms / 1000, logs[i])
+                )
+                for i in range(count)
+            ]
+
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+
+            executed = []
+            for path in logs:
+                with open(path, "r") as f:
+                    executed.extend(line.strip() for line in f if line.strip())
+
+            results.append({
+                "workers": count,
+                "jobs": jobs,
+                "executed": len(executed),
+                "duplicate_publishes": len(executed) - len(set(executed)),
+                "elapsed_seconds": round(elapsed, 3),
+                "jobs_per_second": round(len(executed) / elapsed, 1) if elapsed else 0.0
+            })
+            queue.close()
+    return results